@@ -0,0 +1,31 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+@contextmanager
+def atomic_path(file_path):
+    """Yield a temporary path beside file_path that replaces it once the block completes.
+
+    If the block fails the temporary file is removed and file_path is left
+    as it was.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".bank-", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.chmod(tmp_path, 0o644)  # mkstemp creates files private to the owner
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+@contextmanager
+def atomic_write(file_path, mode='w'):
+    """Open a file that is synced and then replaces file_path once the block completes."""
+    with atomic_path(file_path) as tmp_path:
+        with open(tmp_path, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
@@ -1,95 +1,798 @@
-import json
-import random
+import operator
+import os
+from itertools import chain
 from employee import Employee
 from customer import Customer
+from checkpoints import Checkpoints
+from columns import ColumnStore
+from journal import Journal
+from ledger import Ledger
+from portfolio import CreditPortfolio
+from reports import Reports
+from scheduler import Scheduler
+from mmap_store import MappedSnapshot, MappedCustomers, MappedNames, is_snapshot, read_records
+from sqlite_store import SQLiteStore
+import money
+import storage
+
+BULK_CHUNK_SIZE = 10000
 
 class Bank:
-    def __init__(self):
-        self.employees = []
-        self.customers = []
+    def __init__(self, columnar=False, seed=None, debug=False, ledger_dir=None):
+        self.employees = {}  # id -> Employee
+        self.customers = {}  # id -> Customer
+        self.employee_ids = {}  # name -> [ids]
+        self.customer_ids = {}  # name -> [ids]
+        self.next_employee_id = 1
+        self.next_customer_id = 1
         self.current_day = 1
         self.day_of_week = 0  # Monday
-        self.schedule = {day: [] for day in range(6)}  # Monday to Saturday
-        self.balance = 0.0
-    
+        self.scheduler = Scheduler(seed)
+        self.balance = 0  # All money is in integer cents
+        self.columns = ColumnStore() if columnar else None
+        self.portfolio = CreditPortfolio()
+        self.ledger = Ledger(ledger_dir)  # Spills old entries to ledger_dir when given
+        self.journal = None
+        self.store = None
+        self.checkpoints = None
+        # Running totals behind the daily P&L, kept up to date on every change
+        self.total_monthly_income = 0
+        self.income_carry = 0  # Income accrued but not yet a whole cent, in thirtieths of a cent
+        self.daily_payroll = [0] * 6
+        self.position_payroll = {}  # position -> weekly payroll
+        self.reports = Reports()
+        self.debug = debug  # Cross-check the running totals against a full recount
+
+    def __getstate__(self):
+        if self.store is not None:
+            raise TypeError("close the database before copying a database-backed Bank")
+        state = self.__dict__.copy()
+        state["journal"] = None  # Copies must not write to the original's journal
+        state["checkpoints"] = None
+        return state
+
+    def _log(self, op, *args):
+        if self.journal is not None:
+            self.journal.append(op, *args)
+            if self.journal.snapshot_due():
+                self.journal.snapshot(self)
+        if self.store is not None:
+            self.store.changed(self)
+
     def advance_day(self):
-        daily_expenses = self.calculate_daily_expenses()
-        daily_income = self.calculate_daily_income()
-        self.balance += daily_income - daily_expenses
-        
-        self.current_day += 1
-        self.day_of_week = (self.day_of_week + 1) % 7
-        if self.day_of_week == 6:  # Skip Sunday
-            self.day_of_week = 0
-            self.current_day += 1
-        for employee in self.employees:
-            employee.days_employed += 1
+        self._simulate_days(1)
+        self._log("advance_day", self.balance)
+
+    def _advance_calendar(self, days):
+        weeks, self.day_of_week = divmod(self.day_of_week + days, 6)
+        self.current_day += days + weeks  # Skip Sunday at every week boundary
+        for employee in self.employees.values():
+            employee.days_employed += days
+
+    def advance_days(self, days):
+        """Advance several days at once from the running totals and return the balance after each one."""
+        if days <= 0:
+            return []
+        balances = self._simulate_days(days)
+        self._log("advance_days", days, self.balance)
+        return balances
+
+    def _simulate_days(self, days):
+        if self.checkpoints is None:
+            return self._run_days(days)
+        # Stop at every checkpoint on the way
+        balances = []
+        while days:
+            run = min(days, self.checkpoints.days_to_next())
+            balances += self._run_days(run)
+            self.checkpoints.advanced(run)
+            days -= run
+            if self.checkpoints.days_to_next() == self.checkpoints.every:
+                self.checkpoint()
+        return balances
+
+    def _run_days(self, days):
+        if self.debug:
+            _check_total("monthly income", self.total_monthly_income, self.recount_monthly_income())
+        incomes, self.income_carry = money.accrue(self.total_monthly_income, self.income_carry, days)
+        expenses = [self.calculate_daily_expenses(day) for day in range(6)]
+        week = expenses[self.day_of_week:] + expenses[:self.day_of_week]
+        repayments = self.portfolio.collect(days)
+        balances = money.running_balance(self.balance, incomes, week * (days // 6) + week[:days % 6], repayments)
+        self.reports.record_days(self.current_day, self.day_of_week, incomes, expenses, repayments, balances)
+        self.balance = balances[-1]
+        self._advance_calendar(days)
+        return balances
     
-    def calculate_daily_expenses(self):
-        daily_expenses = sum(e.hourly_rate * 8 for e in self.employees if e.name in self.schedule[self.day_of_week])
+    def calculate_daily_expenses(self, day=None):
+        if day is None:
+            day = self.day_of_week
+        daily_expenses = self.daily_payroll[day]
+        if self.debug:
+            _check_total("daily expenses", daily_expenses, self.recount_daily_expenses(day))
         return daily_expenses
     
     def calculate_daily_income(self):
-        daily_income = sum(c.monthly_income / 30 for c in self.customers)
-        return daily_income
+        """Income the next simulated day brings in, in whole cents."""
+        if self.debug:
+            _check_total("monthly income", self.total_monthly_income, self.recount_monthly_income())
+        return money.accrue(self.total_monthly_income, self.income_carry, 1)[0][0]
+
+    def recount_daily_expenses(self, day):
+        if self.columns is not None:
+            return self.columns.daily_expenses(day)
+        return sum(self.employees[i].hourly_rate * 8 for i in self.scheduler.working_on(day))
+
+    def recount_monthly_income(self):
+        if self.columns is not None:
+            return self.columns.monthly_income()
+        if self.store is not None:
+            return self.store.total_monthly_income()
+        return sum(c.monthly_income for c in self.customers.values())
+
+    def _update_payroll(self, employee, sign):
+        day_off = self.scheduler.days_off.get(employee.id)
+        if day_off is None:
+            return
+        daily_wage = sign * employee.hourly_rate * 8
+        for day in range(6):
+            if day != day_off:
+                self.daily_payroll[day] += daily_wage
+        self.position_payroll[employee.position] = self.position_payroll.get(employee.position, 0) + daily_wage * 5
+
+    def _clear_payroll(self):
+        self.daily_payroll = [0] * 6
+        self.position_payroll = {}
     
+    def _register_employee(self, employee):
+        employee.hourly_rate = operator.index(employee.hourly_rate)  # Whole cents, checked before anything changes
+        if employee.id is None or employee.id in self.employees:
+            employee.id = self.next_employee_id
+        self.next_employee_id = max(self.next_employee_id, employee.id + 1)
+        self.employees[employee.id] = employee
+        self.employee_ids.setdefault(employee.name, []).append(employee.id)
+        if self.checkpoints is not None:
+            self.checkpoints.added_employee(employee.id)
+        if self.columns is not None:
+            self.columns.add_employee(employee)
+        if self.store is not None:
+            self.store.put_employee(employee)
+
+    def _register_customer(self, customer):
+        customer.balance = operator.index(customer.balance)
+        customer.monthly_income = operator.index(customer.monthly_income)
+        if customer.id is None or customer.id in self.customers:
+            customer.id = self.next_customer_id
+        self.next_customer_id = max(self.next_customer_id, customer.id + 1)
+        self.customers[customer.id] = customer
+        if self.store is None:  # The database indexes names itself
+            self.customer_ids.setdefault(customer.name, []).append(customer.id)
+        if self.checkpoints is not None:
+            self.checkpoints.added_customer(customer.id)
+        self.total_monthly_income += customer.monthly_income
+        self.reports.balances.add(customer.balance)
+        if self.columns is not None:
+            self.columns.add_customer(customer)
+        for loan in customer.loans:
+            self.portfolio.add_loan(loan)
+        for card in customer.credit_cards:
+            self.portfolio.add_credit_card(card)
+
+    def get_employee(self, employee_name):
+        ids = self.employee_ids.get(employee_name)
+        return self.employees[ids[0]] if ids else None
+
+    def get_customer(self, customer_name):
+        ids = self.customer_ids.get(customer_name)
+        return self.customers[ids[0]] if ids else None
+
     def hire_employee(self, employee):
-        self.employees.append(employee)
-        self.assign_schedule()
-    
+        self._register_employee(employee)
+        day_off = self._place_employee(employee)
+        self._log("hire_employee", employee.to_dict(), day_off)
+
     def fire_employee(self, employee_name):
-        self.employees = [e for e in self.employees if e.name != employee_name]
-        self.assign_schedule()
-    
+        if employee_name in self.employee_ids:
+            self._log("fire_employee", employee_name)
+        for employee_id in self.employee_ids.pop(employee_name, []):
+            self._unregister_employee(self.employees[employee_id])
+
+    def _unregister_employee(self, employee):
+        self._save_employee(employee)
+        del self.employees[employee.id]
+        self._update_payroll(employee, -1)
+        self.scheduler.remove(employee)
+        if self.columns is not None:
+            self.columns.remove_employee(employee.id)
+        if self.store is not None:
+            self.store.delete_employee(employee.id)
+
+    def _place_employee(self, employee, day_off=None):
+        day_off = self.scheduler.place(employee, day_off)
+        self._update_payroll(employee, 1)
+        if self.columns is not None:
+            self.columns.set_schedule_mask(employee.id, self.scheduler.mask(employee.id))
+        return day_off
+
     def assign_schedule(self):
-        self.schedule = {day: [] for day in range(6)}  # Clear the schedule
-        for employee in self.employees:
-            days_to_work = random.sample(range(6), 5)  # Work 5 out of 6 days
-            for day in days_to_work:
-                self.schedule[day].append(employee.name)
-    
+        """Rebuild the whole rota from scratch, e.g. after a bulk change of staff."""
+        for employee in self.employees.values():
+            self._save_employee(employee)
+        self.scheduler.clear()
+        self._clear_payroll()
+        for employee in self.employees.values():
+            self._place_employee(employee)
+        self._log("schedule", self.scheduler.days_off)
+
+    def _restore_schedule(self, days_off):
+        for employee in self.employees.values():
+            self._save_employee(employee)
+        self.scheduler.clear()
+        self._clear_payroll()
+        if self.columns is not None:
+            self.columns.clear_schedule()
+        for employee_id, day_off in days_off.items():
+            employee = self.employees.get(int(employee_id))
+            if employee is not None:
+                self._place_employee(employee, day_off)
+
+    @property
+    def schedule(self):
+        return self.scheduler.names_by_day()
+
     def get_employee_schedule(self):
         return self.schedule
     
     def get_employees_working_on_day(self, day):
-        return self.schedule.get(day, [])
+        return list(self.scheduler.working_on(day).values())
 
     def generate_weekly_report(self):
-        return self.schedule
+        """Latest week's P&L, staffing, payroll and balance distribution, from running rollups."""
+        return self.reports.weekly_report(self.scheduler, self.position_payroll)
 
     def add_customer(self, customer):
-        self.customers.append(customer)
+        self._register_customer(customer)
+        self._log("add_customer", customer.to_dict())
+
+    def add_customers_bulk(self, customers, chunk_size=BULK_CHUNK_SIZE):
+        """Add customers from any iterable, journaling one entry per chunk. Returns the count."""
+        count = 0
+        for chunk in _chunks(customers, chunk_size):
+            for customer in chunk:
+                self._register_customer(customer)
+            self._log("add_customers", [c.to_dict() for c in chunk])
+            count += len(chunk)
+        return count
+
+    def hire_employees_bulk(self, employees, chunk_size=BULK_CHUNK_SIZE):
+        """Hire employees from any iterable, journaling one entry per chunk. Returns the count."""
+        count = 0
+        for chunk in _chunks(employees, chunk_size):
+            for employee in chunk:
+                self._register_employee(employee)
+            days_off = [self._place_employee(employee) for employee in chunk]
+            self._log("hire_employees", [e.to_dict() for e in chunk], days_off)
+            count += len(chunk)
+        return count
+
+    def set_customer_income(self, customer_name, monthly_income):
+        monthly_income = operator.index(monthly_income)
+        customer = self.get_customer(customer_name)
+        if customer is not None:
+            self._save_customer(customer)
+            self.total_monthly_income += monthly_income - customer.monthly_income
+            customer.monthly_income = monthly_income
+            if self.columns is not None:
+                self.columns.set_customer_income(customer.id, monthly_income)
+            self._customer_updated(customer)
+            self._log("set_customer_income", customer_name, monthly_income)
+
+    def total_customer_balance(self):
+        if self.columns is not None:
+            return self.columns.total_balance()
+        if self.store is not None:
+            return self.store.total_balance()
+        return sum(c.balance for c in self.customers.values())
+
+    def _save_customer(self, customer):
+        # Called before every change to an existing customer
+        if self.checkpoints is not None:
+            self.checkpoints.save_customer(customer)
+
+    def _save_employee(self, employee):
+        if self.checkpoints is not None:
+            self.checkpoints.save_employee(employee, self.scheduler.days_off.get(employee.id))
+
+    def _customer_updated(self, customer, old_balance=None):
+        if old_balance is not None:
+            self.reports.balances.move(old_balance, customer.balance)
+        if self.columns is not None:
+            self.columns.set_customer_balance(customer.id, customer.balance)
+        if self.store is not None:
+            self.store.put_customer(customer)
+
+    def _credit(self, customer_name, amount, kind):
+        amount = operator.index(amount)  # Whole cents, checked before anything changes
+        customer = self.get_customer(customer_name)
+        if customer is None:
+            return False
+        self._save_customer(customer)
+        old_balance = customer.balance
+        customer.balance += amount
+        self.ledger.record(self.current_day, customer.id, amount, kind)
+        self._customer_updated(customer, old_balance)
+        return True
+
+    def _debit(self, customer_name, amount, kind):
+        amount = operator.index(amount)
+        # Take the money from the first of the customer's accounts that covers it
+        for customer_id in self.customer_ids.get(customer_name, []):
+            customer = self.customers[customer_id]
+            if customer.balance >= amount:
+                self._save_customer(customer)
+                old_balance = customer.balance
+                customer.balance -= amount
+                self.ledger.record(self.current_day, customer.id, -amount, kind)
+                self._customer_updated(customer, old_balance)
+                return True
+        return False
 
     def customer_deposit(self, customer_name, amount):
-        for customer in self.customers:
-            if customer.name == customer_name:
-                customer.balance += amount
-                customer.add_transaction(amount)
-                break
+        if self._credit(customer_name, amount, "deposit"):
+            self._log("customer_deposit", customer_name, amount)
     
     def customer_withdraw(self, customer_name, amount):
-        for customer in self.customers:
-            if customer.name == customer_name and customer.balance >= amount:
-                customer.balance -= amount
-                customer.add_transaction(-amount)
-                break
+        if self._debit(customer_name, amount, "withdrawal"):
+            self._log("customer_withdraw", customer_name, amount)
+
+    def can_withdraw(self, customer_name, amount):
+        return any(self.customers[i].balance >= amount for i in self.customer_ids.get(customer_name, []))
+
+    def customer_transfer(self, from_name, to_name, amount):
+        """Move amount between two customers of this bank, returning whether it did."""
+        if self.get_customer(to_name) is None or not self._debit(from_name, amount, "transfer"):
+            return False
+        self._credit(to_name, amount, "transfer")
+        self._log("customer_transfer", from_name, to_name, amount)
+        return True
+
+    def transfer_out(self, customer_name, amount):
+        """Sending leg of a transfer to another bank, returning whether it was covered."""
+        if not self._debit(customer_name, amount, "transfer"):
+            return False
+        self._log("transfer_out", customer_name, amount)
+        return True
+
+    def transfer_in(self, customer_name, amount):
+        """Receiving leg of a transfer from another bank, returning whether the customer exists."""
+        if not self._credit(customer_name, amount, "transfer"):
+            return False
+        self._log("transfer_in", customer_name, amount)
+        return True
+
+    def customer_statement(self, customer_name, first_day=None, last_day=None):
+        """Ledger entries (day, customer id, amount, kind) for a customer, optionally between two days."""
+        customer = self.get_customer(customer_name)
+        if customer is None:
+            return []
+        return self.ledger.statement(customer.id, first_day, last_day)
+
+    def issue_loan(self, customer_name, amount, interest_rate, term):
+        """Lend amount out of the vault, repaid in daily installments over term months."""
+        amount = operator.index(amount)
+        customer = self.get_customer(customer_name)
+        if customer is None:
+            return
+        self._save_customer(customer)
+        self.portfolio.add_loan(customer.add_loan(amount, interest_rate, term))
+        self.balance -= amount
+        old_balance = customer.balance
+        customer.balance += amount
+        self.ledger.record(self.current_day, customer.id, amount, "loan")
+        self._customer_updated(customer, old_balance)
+        self._log("issue_loan", customer_name, amount, interest_rate, term)
+
+    def open_credit_card(self, customer_name, limit, interest_rate):
+        customer = self.get_customer(customer_name)
+        if customer is not None:
+            self._save_customer(customer)
+            self.portfolio.add_credit_card(customer.add_credit_card(limit, interest_rate))
+            self._customer_updated(customer)
+            self._log("open_credit_card", customer_name, limit, interest_rate)
+
+    def charge_credit_card(self, customer_name, amount, card_index=0):
+        """Pay amount out of the vault on the customer's card, within its limit."""
+        amount = operator.index(amount)
+        customer = self.get_customer(customer_name)
+        if customer is None or card_index >= len(customer.credit_cards):
+            return
+        self._save_customer(customer)
+        if self.portfolio.charge(customer.credit_cards[card_index], amount):
+            self.balance -= amount
+            self._customer_updated(customer)
+            self._log("charge_credit_card", customer_name, amount, card_index)
 
     def save_data(self, file_path):
-        data = {
-            "employees": [e.to_dict() for e in self.employees],
-            "customers": [c.to_dict() for c in self.customers],
+        storage.write_records(file_path, self.iter_records())
+
+    def iter_records(self):
+        yield "bank", {
             "current_day": self.current_day,
             "day_of_week": self.day_of_week,
-            "balance": self.balance
+            "balance": self.balance,
+            "money": money.MONEY_UNIT,
+            "income_carry": self.income_carry,
+            "portfolio_day": self.portfolio.day,
+            "portfolio_unsettled": self.portfolio.unsettled,
+            "days_off": self.scheduler.days_off,
+            "reports": self.reports.to_dict(),
+            "balance_sketch": self.reports.balances.to_dict(),
+            "total_monthly_income": self.total_monthly_income
         }
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+        for e in self.employees.values():
+            yield "employee", e.to_dict()
+        for c in self.customers.values():
+            yield "customer", c.to_dict()
+        for segment in self.ledger.iter_segments():
+            yield "ledger", segment
 
     def load_data(self, file_path):
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            self.employees = [Employee.from_dict(e) for e in data['employees']]
-            self.customers = [Customer.from_dict(c) for c in data['customers']]
-            self.current_day = data['current_day']
-            self.day_of_week = data['day_of_week']
-            self.balance = data['balance']
+        if is_snapshot(file_path):
+            self.open_snapshot(file_path)
+        else:
+            self.load_records(storage.read_records(file_path))
+
+    def load_records(self, records):
+        """Replace the bank's state with (kind, data) records, converting any saved in dollars, and return the header."""
+        records = iter(records)
+        # Reading the header opens the file, so a missing or unreadable one leaves the bank as it was
+        first = next(records, None)
+        self.close_database()
+        self._reset()
+        header = {}
+        legacy = False
+        for kind, data in chain([first] if first else [], records):
+            if kind == "bank":
+                legacy = not money.is_current(data)
+            if legacy:
+                data = money.migrate_record(kind, data)
+            if kind == "employee":
+                self._register_employee(Employee.from_dict(data))
+            elif kind == "customer":
+                self._register_customer(Customer.from_dict(data))
+            elif kind == "ledger":
+                self.ledger.load_segment(data)
+            elif kind == "bank":
+                header = data
+                self._load_header(header)
+        # Schedules name employees, so restore them once everyone is registered
+        if "days_off" in header:
+            self._restore_schedule(header["days_off"])
+        else:
+            self.assign_schedule()
+        self._snapshot_journal()
+        return header
+
+    def _snapshot_journal(self):
+        # The journal only logs changes, so a state replaced wholesale has to be snapshotted into it
+        if self.journal is not None:
+            self.journal.snapshot(self, inline=True)
+
+    def _reset(self):
+        self.checkpoints = None  # They describe the state being replaced
+        self.employees = {}
+        self.customers = {}
+        self.employee_ids = {}
+        self.customer_ids = {}
+        self.next_employee_id = 1
+        self.next_customer_id = 1
+        self.current_day = 1
+        self.day_of_week = 0
+        self.scheduler.clear()
+        self.balance = 0
+        if self.columns is not None:
+            self.columns = ColumnStore()
+        self.portfolio = CreditPortfolio()
+        self.ledger.clear()
+        self.reports = Reports()
+        self.total_monthly_income = 0
+        self.income_carry = 0
+        self._clear_payroll()
+
+    def _load_header(self, header):
+        self.current_day = header['current_day']
+        self.day_of_week = header['day_of_week']
+        self.balance = header['balance']
+        self.income_carry = header.get('income_carry', 0)
+        self.portfolio.day = header.get('portfolio_day', 0)
+        self.portfolio.unsettled = header.get('portfolio_unsettled', 0.0)
+        self.reports.load(header.get('reports', {}))
+
+    def open_database(self, file_path, **options):
+        """Keep the bank in the SQLite database at file_path, loading customers on demand."""
+        self.close_database()
+        store = SQLiteStore(file_path, **options)
+        if store.header() is None:
+            for customer in self.customers.values():
+                store.put_customer(customer)
+            for employee in self.employees.values():
+                store.put_employee(employee)
+            store.commit(self)
+        header = store.header()
+        self._reset()
+        self.customers = store.customers
+        self.customer_ids = store.customer_names
+        self.next_customer_id = store.next_customer_id()
+        self._load_header(header)
+        if "total_monthly_income" in header:
+            self.total_monthly_income = header["total_monthly_income"]
+        else:
+            self.total_monthly_income = store.total_monthly_income()  # Saved before the header carried it
+        if "balance_sketch" in header:
+            self.reports.balances.load(header["balance_sketch"])
+        else:
+            for balance in store.balances():  # Saved before the header carried the sketch
+                self.reports.balances.add(balance)
+        for data in store.ledger_segments():
+            self.ledger.load_segment(data)
+        for data in store.employees():
+            self._register_employee(Employee.from_dict(data))
+        for data in store.credit_customers():
+            customer = Customer.from_dict(data)
+            for loan in customer.loans:
+                self.portfolio.add_loan(loan)
+            for card in customer.credit_cards:
+                self.portfolio.add_credit_card(card)
+        if self.columns is not None:
+            for customer in self.customers.values():
+                self.columns.add_customer(customer)
+        self._restore_schedule(header.get("days_off", {}))
+        self.store = store
+        self._snapshot_journal()
+
+    def open_snapshot(self, file_path):
+        """Map a binary snapshot written by save_data and read customers from it in place."""
+        snapshot = MappedSnapshot(file_path)
+        if not money.is_current(snapshot.header["bank"]):
+            self.load_records(read_records(file_path))
+            return
+        self.close_database()
+        self._reset()
+        header = snapshot.header
+        self._load_header(header["bank"])
+        for data in header["employees"]:
+            self._register_employee(Employee.from_dict(data))
+        self.customers = MappedCustomers(snapshot)
+        self.customer_ids = MappedNames(snapshot)
+        self.next_customer_id = header["next_customer_id"]
+        self.total_monthly_income = header["total_monthly_income"]
+        self.reports.balances.load(header["balance_sketch"])
+        for customer_id in snapshot.sections["credit"]:
+            customer = self.customers[customer_id]
+            for loan in customer.loans:
+                self.portfolio.add_loan(loan)
+            for card in customer.credit_cards:
+                self.portfolio.add_credit_card(card)
+        if self.columns is not None:
+            self.columns.add_customer_columns(snapshot.ids, snapshot.monthly_incomes, snapshot.balances)
+        segments = [snapshot.ledger_segment(number) for number in range(header["ledger_segments"])]
+        index = snapshot.ledger_index()
+        if index is not None:
+            self.ledger.open_mapped(segments, index)
+        else:
+            for segment in segments:  # Saved before snapshots carried the index
+                self.ledger.load_segment(segment)
+        self._restore_schedule(header["bank"].get("days_off", {}))
+        self._snapshot_journal()
+
+    def close_database(self):
+        """Commit and detach the database, leaving an empty in-memory bank."""
+        if self.store is not None:
+            self.store.close(self)
+            self.store = None
+            self._reset()
+
+    def open_journal(self, directory, **options):
+        """Recover from the journal in directory and log every later mutation to it."""
+        self.close_journal()
+        journal = Journal(directory, **options)
+        from_seq = 0
+        legacy = True
+        has_snapshot = os.path.exists(journal.snapshot_path)
+        if has_snapshot:
+            header = self.load_records(storage.read_records(journal.snapshot_path))
+            from_seq = header.get("journal_seq", 0)
+            legacy = not money.is_current(header)
+        elif journal.segments():
+            self.close_database()
+            self._reset()  # The journal was written from an empty bank, not this one
+        for op, args in journal.replay(from_seq):
+            if op == "money":
+                legacy = False  # Sessions log this marker first, entries before it are in dollars
+            elif legacy:
+                args = money.migrate_op(op, args)
+            self._replay(op, args)
+        journal.start()
+        if not has_snapshot:
+            journal.snapshot(self, inline=True)  # So the state recovered from includes what was already loaded
+        self.journal = journal
+        self._log("money", money.MONEY_UNIT)
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def enable_checkpoints(self, every=1, limit=None):
+        """Checkpoint the bank now and after every `every` simulated days, keeping at most limit of them."""
+        if self.store is not None or not isinstance(self.customers, dict):
+            raise TypeError("checkpoints need a bank held in memory, not a database or mapped snapshot")
+        self.checkpoints = Checkpoints(every, limit)
+        self.checkpoint()
+
+    def disable_checkpoints(self):
+        self.checkpoints = None
+
+    def checkpoint(self):
+        """Record the bank as it is now and return the checkpoint's number."""
+        if self.checkpoints is None:
+            raise ValueError("checkpoints are not enabled")
+        random_state = self.scheduler.random.getstate()
+        previous = self.checkpoints.latest()
+        if previous is not None and previous.state["random"] == random_state:
+            random_state = previous.state["random"]  # Only hiring draws from it, so share it until then
+        return self.checkpoints.take(self.current_day, {
+            "day_of_week": self.day_of_week,
+            "balance": self.balance,
+            "income_carry": self.income_carry,
+            "total_monthly_income": self.total_monthly_income,
+            "next_employee_id": self.next_employee_id,
+            "next_customer_id": self.next_customer_id,
+            "random": random_state,
+            "portfolio": self.portfolio.checkpoint(),
+            "reports": self.reports.checkpoint(),
+            "ledger": len(self.ledger)
+        })
+
+    def list_checkpoints(self):
+        """(number, day) of every checkpoint kept, oldest first."""
+        if self.checkpoints is None:
+            return []
+        return [(checkpoint.number, checkpoint.day) for checkpoint in self.checkpoints.history]
+
+    def rewind(self, number=None):
+        """Put the bank back as it was at checkpoint number, the latest one by default."""
+        if self.checkpoints is None:
+            raise ValueError("checkpoints are not enabled")
+        checkpoints = self.checkpoints
+        elapsed = checkpoints.elapsed
+        undone = checkpoints.undo_since(checkpoints.latest().number if number is None else number)
+        self.checkpoints = None  # Undoing changes must not record them again
+        for checkpoint in undone:
+            for customer_id, saved in reversed(checkpoint.customers.items()):
+                self._restore_customer(customer_id, saved)
+            for employee_id, saved in reversed(checkpoint.employees.items()):
+                self._restore_employee(employee_id, saved, elapsed)
+        target = undone[-1]
+        target.customers = {}
+        target.employees = {}
+        for employee in self.employees.values():
+            employee.days_employed -= elapsed - target.elapsed
+        state = target.state
+        self.current_day = target.day
+        self.day_of_week = state["day_of_week"]
+        self.balance = state["balance"]
+        self.income_carry = state["income_carry"]
+        self.total_monthly_income = state["total_monthly_income"]
+        self.next_employee_id = state["next_employee_id"]
+        self.next_customer_id = state["next_customer_id"]
+        self.scheduler.random.setstate(state["random"])
+        self.portfolio.rewind(state["portfolio"])
+        self.reports.rewind(state["reports"])
+        self.ledger.truncate(state["ledger"])
+        self.checkpoints = checkpoints
+        self._snapshot_journal()
+
+    def _restore_customer(self, customer_id, saved):
+        customer = self.customers.get(customer_id)
+        if saved is None:  # Added since the checkpoint
+            if customer is not None:
+                del self.customers[customer_id]
+                ids = self.customer_ids[customer.name]
+                ids.remove(customer_id)
+                if not ids:
+                    del self.customer_ids[customer.name]
+                self.reports.balances.remove(customer.balance)
+                if self.columns is not None:
+                    self.columns.remove_last_customer(customer_id)
+            return
+        balance, monthly_income, transactions, loans, credit_cards = saved
+        self.reports.balances.move(customer.balance, balance)
+        customer.balance = balance
+        customer.monthly_income = monthly_income
+        customer.transactions = ()
+        for amount in transactions:
+            customer.add_transaction(amount)
+        customer.loans = list(loans) if loans else ()
+        customer.credit_cards = [dict(card) for card in credit_cards] if credit_cards else ()
+        if self.columns is not None:
+            self.columns.set_customer_balance(customer_id, balance)
+            self.columns.set_customer_income(customer_id, monthly_income)
+
+    def _restore_employee(self, employee_id, saved, elapsed):
+        employee = self.employees.get(employee_id)
+        if saved is None:  # Hired since the checkpoint
+            if employee is not None:
+                ids = self.employee_ids[employee.name]
+                ids.remove(employee_id)
+                if not ids:
+                    del self.employee_ids[employee.name]
+                self._unregister_employee(employee)
+            return
+        data, day_off = saved
+        if employee is None:  # Fired since
+            employee = Employee.from_dict(dict(data, days_employed=data["days_employed"] + elapsed))
+            self._register_employee(employee)
+        else:  # Rescheduled since
+            self._update_payroll(employee, -1)
+            self.scheduler.remove(employee)
+        if day_off is not None:
+            self._place_employee(employee, day_off)
+
+    def _replay(self, op, args):
+        if op == "customer_deposit":
+            self.customer_deposit(*args)
+        elif op == "customer_withdraw":
+            self.customer_withdraw(*args)
+        elif op == "customer_transfer":
+            self.customer_transfer(*args)
+        elif op == "transfer_out":
+            self.transfer_out(*args)
+        elif op == "transfer_in":
+            self.transfer_in(*args)
+        elif op == "set_customer_income":
+            self.set_customer_income(*args)
+        elif op == "add_customer":
+            self._register_customer(Customer.from_dict(args[0]))
+        elif op == "hire_employee":
+            employee = Employee.from_dict(args[0])
+            self._register_employee(employee)
+            self._place_employee(employee, args[1])
+        elif op == "add_customers":
+            for data in args[0]:
+                self._register_customer(Customer.from_dict(data))
+        elif op == "hire_employees":
+            for data, day_off in zip(*args):
+                employee = Employee.from_dict(data)
+                self._register_employee(employee)
+                self._place_employee(employee, day_off)
+        elif op == "fire_employee":
+            self.fire_employee(*args)
+        elif op == "issue_loan":
+            self.issue_loan(*args)
+        elif op == "open_credit_card":
+            self.open_credit_card(*args)
+        elif op == "charge_credit_card":
+            self.charge_credit_card(*args)
+        elif op == "schedule":
+            self._restore_schedule(args[0])
+        elif op == "advance_day":
+            self._simulate_days(1)
+            self.balance = args[0]
+        elif op == "advance_days":
+            self._simulate_days(args[0])
+            self.balance = args[1]
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _check_total(label, running, recounted):
+    if running != recounted:
+        raise RuntimeError(f"running {label} {running} drifted from recount {recounted}")
@@ -0,0 +1,206 @@
+import csv
+import json
+import sys
+import time
+from bank import Bank
+from employee import Employee
+from customer import Customer
+import bulk
+import intraday
+from money import to_cents
+
+# Argument names and types for every command, in positional order; amounts are given in dollars
+COMMANDS = {
+    "hire": (("name", str), ("age", int), ("position", str), ("hourly_rate", to_cents)),
+    "fire": (("name", str),),
+    "view_employee": (("name", str),),
+    "add_customer": (("name", str), ("age", int), ("balance", to_cents), ("monthly_income", to_cents)),
+    "view_customer": (("name", str),),
+    "statement": (("name", str), ("first_day", int), ("last_day", int)),
+    "deposit": (("name", str), ("amount", to_cents)),
+    "withdraw": (("name", str), ("amount", to_cents)),
+    "transfer": (("name", str), ("to_name", str), ("amount", to_cents)),
+    "issue_loan": (("name", str), ("amount", to_cents), ("interest_rate", float), ("term", int)),
+    "open_credit_card": (("name", str), ("limit", to_cents), ("interest_rate", float)),
+    "charge_credit_card": (("name", str), ("amount", to_cents)),
+    "advance": (("days", int),),
+    "schedule": (),
+    "working_today": (),
+    "weekly_report": (),
+    "intraday": (("day", int), ("seed", int)),
+    "balance": (),
+    "save": (("file_path", str),),
+    "load": (("file_path", str),),
+    "journal": (("directory", str),),
+    "enable_checkpoints": (("every", int), ("limit", int)),
+    "checkpoint": (),
+    "checkpoints": (),
+    "rewind": (("number", int),),
+    "import_customers": (("file_path", str),),
+    "import_employees": (("file_path", str),),
+    "export_customers": (("file_path", str),),
+    "export_employees": (("file_path", str),),
+}
+
+# How many of a command's trailing arguments may be left out
+OPTIONAL_ARGS = {"statement": 2, "advance": 1, "intraday": 2, "enable_checkpoints": 2, "rewind": 1}
+
+# Commands that only read, everything else changes the bank
+REPORTS = {"view_employee", "view_customer", "statement", "schedule", "working_today", "weekly_report", "intraday",
+           "balance", "checkpoints"}
+
+# Commands that act on a single customer account, named by their first argument
+ACCOUNT_COMMANDS = {"add_customer", "view_customer", "statement", "deposit", "withdraw", "transfer",
+                    "issue_loan", "open_credit_card", "charge_credit_card"}
+
+# The numbered choices of the interactive menu
+MENU_CHOICES = {
+    "1": "hire",
+    "2": "fire",
+    "3": "view_employee",
+    "4": "add_customer",
+    "5": "view_customer",
+    "6": "advance",
+    "7": "schedule",
+    "8": "working_today",
+    "9": "weekly_report",
+    "10": "balance",
+    "11": "save",
+    "12": "load",
+    "14": "journal",
+    "16": "intraday",
+}
+
+def accounts(op, args):
+    """Names of the customer accounts a parsed command touches."""
+    if op not in ACCOUNT_COMMANDS:
+        return []
+    return args[:2] if op == "transfer" else args[:1]
+
+def parse_line(line):
+    """Turn one CSV or JSON line into (op, args), or None for blanks and comments."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line[0] in "[{":
+        command = json.loads(line)
+        if isinstance(command, dict):
+            op = MENU_CHOICES.get(str(command["op"]), str(command["op"]))
+            args = []
+            for name, _ in COMMANDS.get(op, ()):
+                if name not in command:
+                    break  # Arguments are positional, so none can follow a missing one
+                args.append(command[name])
+        else:
+            op, *args = command
+    else:
+        op, *args = next(csv.reader([line]))
+    op = MENU_CHOICES.get(str(op), str(op))
+    if op not in COMMANDS:
+        raise ValueError(f"Unknown command: {op}")
+    most = len(COMMANDS[op])
+    least = most - OPTIONAL_ARGS.get(op, 0)
+    if not least <= len(args) <= most:
+        expected = most if least == most else f"{least} to {most}"
+        raise ValueError(f"{op} takes {expected} arguments, got {len(args)}")
+    return op, [convert(value) for (_, convert), value in zip(COMMANDS[op], args)]
+
+def execute(bank, op, args):
+    """Apply one parsed command to bank and return what it reports, if anything."""
+    if op == "hire":
+        bank.hire_employee(Employee(*args))
+    elif op == "fire":
+        bank.fire_employee(*args)
+    elif op == "view_employee":
+        employee = bank.get_employee(*args)
+        return employee.to_dict() if employee else None
+    elif op == "add_customer":
+        bank.add_customer(Customer(*args))
+    elif op == "view_customer":
+        customer = bank.get_customer(*args)
+        return customer.to_dict() if customer else None
+    elif op == "statement":
+        return bank.customer_statement(*args)
+    elif op == "deposit":
+        bank.customer_deposit(*args)
+    elif op == "withdraw":
+        bank.customer_withdraw(*args)
+    elif op == "transfer":
+        return bank.customer_transfer(*args)
+    elif op == "issue_loan":
+        bank.issue_loan(*args)
+    elif op == "open_credit_card":
+        bank.open_credit_card(*args)
+    elif op == "charge_credit_card":
+        bank.charge_credit_card(*args)
+    elif op == "advance":
+        days = args[0] if args else 1
+        if days == 1:
+            bank.advance_day()
+        else:
+            bank.advance_days(days)
+    elif op == "schedule":
+        return bank.get_employee_schedule()
+    elif op == "working_today":
+        return bank.get_employees_working_on_day(bank.day_of_week)
+    elif op == "weekly_report":
+        return bank.generate_weekly_report()
+    elif op == "intraday":
+        return intraday.simulate_day(bank, *args)
+    elif op == "balance":
+        return bank.balance
+    elif op == "save":
+        bank.save_data(*args)
+    elif op == "load":
+        bank.load_data(*args)
+    elif op == "journal":
+        bank.open_journal(*args)
+    elif op == "enable_checkpoints":
+        bank.enable_checkpoints(*args)
+    elif op == "checkpoint":
+        bank.checkpoint()
+    elif op == "checkpoints":
+        return bank.list_checkpoints()
+    elif op == "rewind":
+        bank.rewind(*args)
+    elif op == "import_customers":
+        bulk.import_customers(bank, *args)
+    elif op == "import_employees":
+        bulk.import_employees(bank, *args)
+    elif op == "export_customers":
+        bulk.export_customers(bank, *args)
+    elif op == "export_employees":
+        bulk.export_employees(bank, *args)
+
+def run_batch(bank, lines, out=sys.stdout):
+    """Apply every command in lines to bank and return (commands, seconds)."""
+    count = 0
+    start = time.perf_counter()
+    for line_number, line in enumerate(lines, start=1):
+        try:
+            command = parse_line(line)
+        except (ValueError, KeyError, IndexError) as e:
+            raise ValueError(f"Line {line_number}: {e}") from e
+        if command is not None:
+            try:
+                result = execute(bank, *command)
+            except Exception as e:
+                raise ValueError(f"Line {line_number}: {type(e).__name__}: {e}") from e
+            if command[0] in REPORTS:
+                print(json.dumps(result), file=out)
+            count += 1
+    return count, time.perf_counter() - start
+
+def main(argv):
+    bank = Bank()
+    if argv and argv[0] != "-":
+        with open(argv[0], 'r', newline='') as f:
+            count, elapsed = run_batch(bank, f)
+    else:
+        count, elapsed = run_batch(bank, sys.stdin)
+    bank.close_journal()
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"{count} commands in {elapsed:.3f} s ({rate:,.0f} commands/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
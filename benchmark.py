@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from bank import Bank
+from employee import Employee
+from customer import Customer
+from money import to_cents
+
+POSITIONS = ["Teller", "Teller", "Teller", "Loan Officer", "Manager"]
+DEFAULT_SIZES = "1000:10,10000:100,100000:1000"
+
+def build_bank(num_customers, num_employees=10, columnar=False, seed=0):
+    """Synthetic bank with reproducible ages, balances, incomes and wages."""
+    rng = random.Random(seed)
+    bank = Bank(columnar=columnar, seed=seed)
+    for i in range(num_employees):
+        position = POSITIONS[i % len(POSITIONS)]
+        bank.hire_employee(Employee(f"Employee {i}", rng.randint(18, 65), position, to_cents(round(rng.uniform(12, 40), 2))))
+    for i in range(num_customers):
+        balance = to_cents(round(rng.uniform(0, 20000), 2))
+        bank.add_customer(Customer(f"Customer {i}", rng.randint(18, 90), balance,
+                                   to_cents(round(rng.uniform(1000, 8000), 2))))
+    return bank
+
+def measure(name, func, ops=1, memory=False, **params):
+    """Run func once and return its timing (and peak traced memory) as a result dict."""
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    result = dict(params, benchmark=name, ops=ops, seconds=seconds, per_op=seconds / ops)
+    if memory:
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+def bench_size(num_customers, num_employees, ops=10000, memory=False, columnar=False):
+    size = {"customers": num_customers, "employees": num_employees, "columnar": columnar}
+    results = []
+    built = []
+    results.append(measure("build", lambda: built.append(build_bank(num_customers, num_employees, columnar)),
+                           memory=memory, **size))
+    bank = built[0]
+    rng = random.Random(1)
+
+    results.append(measure("advance_day", lambda: [bank.advance_day() for _ in range(6)], ops=6,
+                           memory=memory, **size))
+    results.append(measure("advance_days_300", lambda: bank.advance_days(300), memory=memory, **size))
+    bank.enable_checkpoints()
+    results.append(measure("advance_days_300_checkpointed", lambda: bank.advance_days(300), memory=memory, **size))
+    results.append(measure("rewind_300", lambda: bank.rewind(bank.list_checkpoints()[0][0]), memory=memory, **size))
+    bank.disable_checkpoints()
+
+    if num_customers:
+        names = [f"Customer {rng.randrange(num_customers)}" for _ in range(ops)]
+        results.append(measure("customer_deposit", lambda: [bank.customer_deposit(n, 1000) for n in names],
+                               ops=ops, memory=memory, **size))
+        results.append(measure("customer_withdraw", lambda: [bank.customer_withdraw(n, 1000) for n in names],
+                               ops=ops, memory=memory, **size))
+
+    hires = [Employee(f"Hire {i}", 30, POSITIONS[i % len(POSITIONS)], 2000) for i in range(min(ops, 1000))]
+    results.append(measure("hire_employee", lambda: [bank.hire_employee(e) for e in hires],
+                           ops=len(hires), memory=memory, **size))
+    results.append(measure("fire_employee", lambda: [bank.fire_employee(e.name) for e in hires],
+                           ops=len(hires), memory=memory, **size))
+    results.append(measure("assign_schedule", bank.assign_schedule, memory=memory, **size))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in ("jsonl", "db"):
+            path = os.path.join(directory, f"bank.{extension}")
+            results.append(measure(f"save_data_{extension}", lambda: bank.save_data(path), memory=memory, **size))
+            results.append(measure(f"load_data_{extension}", lambda: Bank(columnar=columnar).load_data(path),
+                                   memory=memory, **size))
+    return results
+
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_suite(sizes, ops=10000, memory=False, columnar=False):
+    results = []
+    for num_customers, num_employees in sizes:
+        for result in bench_size(num_customers, num_employees, ops, memory, columnar):
+            print(f"{result['benchmark']:>18} {num_customers:>9} customers {num_employees:>7} employees "
+                  f"{result['per_op'] * 1e6:>14.2f} us/op", file=sys.stderr)
+            results.append(result)
+    return {
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+def compare(old, new):
+    """Print the per-operation time of new as a multiple of an earlier run."""
+    key = lambda r: (r["benchmark"], r["customers"], r["employees"], r.get("columnar", False))
+    baseline = {key(r): r for r in old["results"]}
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    for result in new["results"]:
+        before = baseline.get(key(result))
+        if before is None or not before["per_op"]:
+            continue
+        ratio = result["per_op"] / before["per_op"]
+        print(f"{result['benchmark']:>18} {result['customers']:>9} {result['employees']:>7} {ratio:>8.2f}x")
+
+def parse_sizes(text):
+    return [tuple(int(n) for n in size.split(":")) for size in text.split(",")]
+
+def main():
+    parser = argparse.ArgumentParser(description="Time Bank hot paths on synthetic banks.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="comma separated customers:employees pairs, e.g. 10000000:100000")
+    parser.add_argument("--ops", type=int, default=10000, help="operations per teller benchmark")
+    parser.add_argument("--columnar", action="store_true", help="use the columnar backend")
+    parser.add_argument("--memory", action="store_true", help="record peak traced memory (slower)")
+    parser.add_argument("--output", help="write results as JSON to this file instead of stdout")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    report = run_suite(parse_sizes(args.sizes), args.ops, args.memory, args.columnar)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
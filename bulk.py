@@ -0,0 +1,123 @@
+import csv
+from employee import Employee
+from customer import Customer
+from money import to_cents, to_dollars
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet support is optional, CSV always works
+    pa = pq = None
+
+CHUNK_SIZE = 10000
+
+# Column names and types, in constructor order; files hold amounts in dollars
+CUSTOMER_FIELDS = (("name", str), ("age", int), ("balance", to_cents), ("monthly_income", to_cents))
+EMPLOYEE_FIELDS = (("name", str), ("age", int), ("position", str), ("hourly_rate", to_cents))
+NON_NEGATIVE = {"age", "balance", "monthly_income", "hourly_rate"}
+MONEY_FIELDS = {"balance", "monthly_income", "hourly_rate"}
+
+def is_parquet(file_path):
+    return file_path.endswith((".parquet", ".pq"))
+
+def _require_parquet():
+    if pq is None:
+        raise ImportError("pyarrow is required for Parquet files")
+
+def read_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """Yield lists of row dicts from a CSV file with a header row or a Parquet file."""
+    if is_parquet(file_path):
+        _require_parquet()
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+    with open(file_path, 'r', newline='') as f:
+        chunk = []
+        for row in csv.DictReader(f):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def validate_chunk(rows, fields, first_row):
+    """Convert a chunk of row dicts to argument tuples, returning (values, errors)."""
+    values = []
+    errors = []
+    for row_number, row in enumerate(rows, start=first_row):
+        try:
+            converted = []
+            for name, convert in fields:
+                value = row.get(name)
+                if value is None or value == "":
+                    raise ValueError(f"missing {name}")
+                value = convert(value)
+                if name in NON_NEGATIVE and value < 0:
+                    raise ValueError(f"negative {name}")
+                converted.append(value)
+            values.append(converted)
+        except (TypeError, ValueError) as e:
+            errors.append(f"row {row_number}: {e}")
+    return values, errors
+
+def _records(file_path, fields, factory, skip_invalid, skipped):
+    row_number = 1
+    for rows in read_chunks(file_path):
+        values, errors = validate_chunk(rows, fields, row_number)
+        if errors and not skip_invalid:
+            raise ValueError(f"{file_path} {errors[0]} ({len(errors)} invalid rows in chunk)")
+        skipped.extend(errors)
+        row_number += len(rows)
+        for args in values:
+            yield factory(*args)
+
+def import_customers(bank, file_path, skip_invalid=False):
+    """Stream customers from file_path into bank, returning (added, skipped rows)."""
+    skipped = []
+    added = bank.add_customers_bulk(_records(file_path, CUSTOMER_FIELDS, Customer, skip_invalid, skipped))
+    return added, skipped
+
+def import_employees(bank, file_path, skip_invalid=False):
+    """Stream employees from file_path into bank, returning (hired, skipped rows)."""
+    skipped = []
+    hired = bank.hire_employees_bulk(_records(file_path, EMPLOYEE_FIELDS, Employee, skip_invalid, skipped))
+    return hired, skipped
+
+def _export(records, fields, file_path):
+    names = ["id"] + [name for name, _ in fields]
+    if is_parquet(file_path):
+        _require_parquet()
+        writer = None
+        try:
+            for chunk in _row_chunks(records, names):
+                table = pa.Table.from_pydict({name: [row[i] for row in chunk] for i, name in enumerate(names)})
+                if writer is None:
+                    writer = pq.ParquetWriter(file_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+    with open(file_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for chunk in _row_chunks(records, names):
+            writer.writerows(chunk)
+
+def _row_chunks(records, names):
+    chunk = []
+    for record in records:
+        chunk.append([to_dollars(getattr(record, name)) if name in MONEY_FIELDS else getattr(record, name)
+                      for name in names])
+        if len(chunk) >= CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def export_customers(bank, file_path):
+    _export(bank.customers.values(), CUSTOMER_FIELDS, file_path)
+
+def export_employees(bank, file_path):
+    _export(bank.employees.values(), EMPLOYEE_FIELDS, file_path)
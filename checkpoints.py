@@ -0,0 +1,86 @@
+class Checkpoint:
+    """The bank as of one moment: its small state plus undo records for what changed after it."""
+    __slots__ = ("number", "day", "elapsed", "state", "customers", "employees")
+
+    def __init__(self, number, day, elapsed, state):
+        self.number = number
+        self.day = day
+        self.elapsed = elapsed  # Days simulated since checkpoints were enabled
+        self.state = state
+        self.customers = {}  # id -> saved fields before the first change since this checkpoint, None if added
+        self.employees = {}  # id -> (saved record, day off) before the first change since, None if hired
+
+class Checkpoints:
+    """Copy-on-write history of a Bank, one checkpoint every few simulated days.
+
+    A checkpoint copies only the bank's small state: the calendar, running
+    totals, the credit book's aggregates and how long the append-only
+    ledger and loan columns were. Customers and employees are not copied.
+    Instead the first change to one after a checkpoint saves its previous
+    fields into that checkpoint, so memory grows with what changes between
+    checkpoints, not with the population times the number of checkpoints.
+    Rewinding applies those undo records newest first.
+    """
+    def __init__(self, every=1, limit=None):
+        self.every = every
+        self.limit = limit  # Oldest checkpoints are dropped beyond this many
+        self.elapsed = 0
+        self.history = []
+        self.next_number = 0
+
+    def __len__(self):
+        return len(self.history)
+
+    def days_to_next(self):
+        return self.every - self.elapsed % self.every
+
+    def advanced(self, days):
+        self.elapsed += days
+
+    def take(self, day, state):
+        """Start a new checkpoint and return its number."""
+        checkpoint = Checkpoint(self.next_number, day, self.elapsed, state)
+        self.next_number += 1
+        self.history.append(checkpoint)
+        if self.limit is not None and len(self.history) > self.limit:
+            del self.history[0]  # Only rewinding to it needed its undo records
+        return checkpoint.number
+
+    def latest(self):
+        return self.history[-1] if self.history else None
+
+    def find(self, number):
+        for index, checkpoint in enumerate(self.history):
+            if checkpoint.number == number:
+                return index
+        raise KeyError(f"no checkpoint {number}")
+
+    def undo_since(self, number):
+        """Drop the checkpoints after number and return, newest first, those whose changes need undoing."""
+        index = self.find(number)
+        undone = self.history[index:][::-1]
+        del self.history[index + 1:]
+        target = self.history[index]
+        self.elapsed = target.elapsed
+        self.next_number = number + 1
+        return undone
+
+    def save_customer(self, customer):
+        saved = self.history[-1].customers
+        if customer.id not in saved:
+            saved[customer.id] = (customer.balance, customer.monthly_income, tuple(customer.transactions),
+                                  tuple(customer.loans), tuple(dict(card) for card in customer.credit_cards))
+
+    def added_customer(self, customer_id):
+        self.history[-1].customers.setdefault(customer_id, None)
+
+    def save_employee(self, employee, day_off):
+        saved = self.history[-1].employees
+        if employee.id not in saved:
+            data = employee.to_dict()
+            # Kept relative to the days simulated, since every employee's count grows with them
+            data["days_employed"] -= self.elapsed
+            saved[employee.id] = (data, day_off)
+
+    def added_employee(self, employee_id):
+        self.history[-1].employees.setdefault(employee_id, None)
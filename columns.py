@@ -0,0 +1,91 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, fall back to plain Python sums
+    np = None
+
+class ColumnStore:
+    """Columnar copy of the fields the daily P&L needs.
+
+    Values are cents in compact int64 array.array columns (one row per
+    customer or employee). When NumPy is installed the reductions run over
+    zero-copy views of those arrays, otherwise they fall back to the
+    builtin sum; either way the totals are exact.
+    """
+    def __init__(self):
+        self.customer_rows = {}  # customer id -> row
+        self.monthly_incomes = array('q')
+        self.balances = array('q')
+        self.employee_rows = {}  # employee id -> row
+        self.employee_row_ids = []  # row -> employee id
+        self.daily_wages = array('q')  # hourly_rate * 8
+        self.schedule_masks = array('B')  # bit n set = works on day n
+
+    def add_customer(self, customer):
+        self.customer_rows[customer.id] = len(self.monthly_incomes)
+        self.monthly_incomes.append(customer.monthly_income)
+        self.balances.append(customer.balance)
+
+    def add_customer_columns(self, ids, monthly_incomes, balances):
+        """Append many customers at once from id, income and balance columns."""
+        start = len(self.balances)
+        self.customer_rows.update(zip(ids, range(start, start + len(ids))))
+        self.monthly_incomes.frombytes(memoryview(monthly_incomes).cast("B"))
+        self.balances.frombytes(memoryview(balances).cast("B"))
+
+    def remove_last_customer(self, customer_id):
+        """Drop the row of the customer added last, as rewinding a checkpoint does newest first."""
+        if self.customer_rows[customer_id] != len(self.balances) - 1:
+            raise ValueError(f"customer {customer_id} was not the last one added")
+        del self.customer_rows[customer_id]
+        self.monthly_incomes.pop()
+        self.balances.pop()
+
+    def set_customer_balance(self, customer_id, balance):
+        self.balances[self.customer_rows[customer_id]] = balance
+
+    def set_customer_income(self, customer_id, monthly_income):
+        self.monthly_incomes[self.customer_rows[customer_id]] = monthly_income
+
+    def add_employee(self, employee, mask=0):
+        self.employee_rows[employee.id] = len(self.daily_wages)
+        self.employee_row_ids.append(employee.id)
+        self.daily_wages.append(employee.hourly_rate * 8)
+        self.schedule_masks.append(mask)
+
+    def remove_employee(self, employee_id):
+        # Swap the last row into the hole so removal stays O(1)
+        row = self.employee_rows.pop(employee_id)
+        last_id = self.employee_row_ids.pop()
+        last_wage = self.daily_wages.pop()
+        last_mask = self.schedule_masks.pop()
+        if last_id != employee_id:
+            self.employee_rows[last_id] = row
+            self.employee_row_ids[row] = last_id
+            self.daily_wages[row] = last_wage
+            self.schedule_masks[row] = last_mask
+
+    def set_schedule_mask(self, employee_id, mask):
+        self.schedule_masks[self.employee_rows[employee_id]] = mask
+
+    def clear_schedule(self):
+        self.schedule_masks = array('B', bytes(len(self.schedule_masks)))
+
+    def monthly_income(self):
+        if np is not None and self.monthly_incomes:
+            return int(np.frombuffer(self.monthly_incomes, dtype=np.int64).sum())
+        return sum(self.monthly_incomes)
+
+    def daily_expenses(self, day):
+        bit = 1 << day
+        if np is not None and self.daily_wages:
+            wages = np.frombuffer(self.daily_wages, dtype=np.int64)
+            masks = np.frombuffer(self.schedule_masks, dtype=np.uint8)
+            return int(wages[(masks & bit) != 0].sum())
+        return sum(wage for wage, mask in zip(self.daily_wages, self.schedule_masks) if mask & bit)
+
+    def total_balance(self):
+        if np is not None and self.balances:
+            return int(np.frombuffer(self.balances, dtype=np.int64).sum())
+        return sum(self.balances)
@@ -1,39 +1,60 @@
+from collections import deque
+
 class Customer:
+    __slots__ = ("id", "name", "age", "balance", "monthly_income", "transactions", "loans", "credit_cards")
+
+    history_size = 5  # Number of recent transactions each customer keeps
+
     def __init__(self, name, age, balance, monthly_income):
+        self.id = None
         self.name = name
         self.age = age
         self.balance = balance
         self.monthly_income = monthly_income
-        self.transactions = []
-        self.loans = []
-        self.credit_cards = []
+        # Empty tuples are shared, the containers are only created on first use
+        self.transactions = ()
+        self.loans = ()
+        self.credit_cards = ()
 
     def add_transaction(self, amount):
+        if not self.transactions:
+            self.transactions = deque(maxlen=Customer.history_size)
         self.transactions.append(amount)
-        if len(self.transactions) > 5:
-            self.transactions.pop(0)
     
     def add_loan(self, amount, interest_rate, term):
-        self.loans.append({"amount": amount, "interest_rate": interest_rate, "term": term})
+        if not self.loans:
+            self.loans = []
+        loan = {"amount": amount, "interest_rate": interest_rate, "term": term}
+        self.loans.append(loan)
+        return loan
 
     def add_credit_card(self, limit, interest_rate):
-        self.credit_cards.append({"limit": limit, "interest_rate": interest_rate})
+        if not self.credit_cards:
+            self.credit_cards = []
+        card = {"limit": limit, "interest_rate": interest_rate}
+        self.credit_cards.append(card)
+        return card
 
     def to_dict(self):
         return {
+            "id": self.id,
             "name": self.name,
             "age": self.age,
             "balance": self.balance,
             "monthly_income": self.monthly_income,
-            "transactions": self.transactions,
-            "loans": self.loans,
-            "credit_cards": self.credit_cards
+            "transactions": list(self.transactions),
+            "loans": list(self.loans),
+            "credit_cards": list(self.credit_cards)
         }
     
     @staticmethod
     def from_dict(data):
         customer = Customer(data['name'], data['age'], data['balance'], data['monthly_income'])
-        customer.transactions = data['transactions']
-        customer.loans = data['loans']
-        customer.credit_cards = data['credit_cards']
+        customer.id = data.get('id')
+        for amount in data['transactions']:
+            customer.add_transaction(amount)
+        if data['loans']:
+            customer.loans = data['loans']
+        if data['credit_cards']:
+            customer.credit_cards = data['credit_cards']
         return customer
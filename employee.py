@@ -1,7 +1,10 @@
 import json
 
 class Employee:
+    __slots__ = ("id", "name", "age", "position", "hourly_rate", "days_employed", "employee_rating", "hours_worked_week")
+
     def __init__(self, name, age, position, hourly_rate):
+        self.id = None
         self.name = name
         self.age = age
         self.position = position
@@ -12,6 +15,7 @@ class Employee:
     
     def to_dict(self):
         return {
+            "id": self.id,
             "name": self.name,
             "age": self.age,
             "position": self.position,
@@ -24,6 +28,7 @@ class Employee:
     @staticmethod
     def from_dict(data):
         employee = Employee(data['name'], data['age'], data['position'], data['hourly_rate'])
+        employee.id = data.get('id')
         employee.days_employed = data['days_employed']
         employee.employee_rating = data['employee_rating']
         employee.hours_worked_week = data['hours_worked_week']
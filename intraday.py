@@ -0,0 +1,118 @@
+import random
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+from money import DAYS_PER_MONTH
+
+OPENING_MINUTES = 8 * 60  # The eight hour shift the payroll pays for
+SERVICE_MINUTES = 4.0  # Mean time a teller spends with one customer
+INCOME_PER_VISIT = 100000  # Every $1,000 (in cents) of monthly income brings one branch visit a month
+TELLER_POSITIONS = ("Teller",)
+
+# Event kinds, ordered so a teller freed at the same minute serves the line before a new arrival joins it
+DEPARTURE, ARRIVAL = 0, 1
+
+def tellers_on(bank, day, positions=TELLER_POSITIONS):
+    """Number of employees on shift on day who serve customers; positions=None counts everyone."""
+    if positions is None:
+        return len(bank.get_employees_working_on_day(day))
+    return sum(1 for employee_id in bank.scheduler.working_on(day)
+               if bank.employees[employee_id].position in positions)
+
+def simulate_day(bank, day=None, seed=None, positions=TELLER_POSITIONS, service_minutes=SERVICE_MINUTES,
+                 income_per_visit=INCOME_PER_VISIT, opening_minutes=OPENING_MINUTES):
+    """Run one day of branch visits through the tellers on shift and return queueing statistics.
+
+    Each customer visits as a Poisson process whose rate follows their
+    monthly income. Together those are one Poisson process at the summed
+    rate, so arrivals come from the bank's running income total without
+    visiting any customer. Arrivals stop at closing time, and everyone
+    already in line is still served. Service times are exponential.
+
+    Events sit in a heap keyed by minute. Only the next arrival and the
+    tellers' service completions are ever pending, so the heap stays as
+    small as the staff and each event costs O(log tellers).
+    """
+    if day is None:
+        day = bank.day_of_week
+    rng = random.Random(seed)
+    expovariate = rng.expovariate
+    tellers = tellers_on(bank, day, positions)
+    arrival_rate = bank.total_monthly_income / income_per_visit / DAYS_PER_MONTH / opening_minutes
+    service_rate = 1 / service_minutes
+
+    events = []
+    if arrival_rate > 0:
+        first_arrival = expovariate(arrival_rate)
+        if first_arrival < opening_minutes:
+            heappush(events, (first_arrival, ARRIVAL))
+    line = deque()  # Arrival minute of everyone waiting
+    waits = array('d')
+    free = tellers
+    arrivals = processed = max_line = 0
+    busy_minutes = line_area = now = 0.0
+    while events:
+        time, kind = heappop(events)
+        processed += 1
+        line_area += len(line) * (time - now)
+        now = time
+        if kind == ARRIVAL:
+            arrivals += 1
+            next_arrival = now + expovariate(arrival_rate)
+            if next_arrival < opening_minutes:
+                heappush(events, (next_arrival, ARRIVAL))
+            if free:
+                free -= 1
+                waits.append(0.0)
+            else:
+                line.append(now)
+                if len(line) > max_line:
+                    max_line = len(line)
+                continue
+        elif line:
+            waits.append(now - line.popleft())
+        else:
+            free += 1
+            continue
+        service = expovariate(service_rate)
+        busy_minutes += service
+        heappush(events, (now + service, DEPARTURE))
+
+    ordered = sorted(waits)
+    return {
+        "day": day,
+        "tellers": tellers,
+        "arrivals": arrivals,
+        "served": len(waits),
+        "unserved": len(line),  # Only when nobody is on shift
+        "events": processed,
+        "offered_load": arrival_rate * service_minutes / tellers if tellers else None,
+        "utilization": busy_minutes / (tellers * max(now, opening_minutes)) if tellers else None,
+        "mean_line": line_area / now if now else 0.0,
+        "max_line": max_line,
+        "mean_wait": sum(waits) / len(waits) if waits else 0.0,
+        "p50_wait": _quantile(ordered, 0.5),
+        "p95_wait": _quantile(ordered, 0.95),
+        "p99_wait": _quantile(ordered, 0.99),
+        "max_wait": ordered[-1] if ordered else 0.0,
+        "last_departure": now
+    }
+
+def _quantile(ordered, q):
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+def simulate_week(bank, seed=None, **options):
+    """simulate_day for each of the six open days, seeded one after another."""
+    rng = random.Random(seed)
+    return [simulate_day(bank, day, rng.getrandbits(64), **options) for day in range(6)]
+
+def format_results(results):
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+    lines = [f"{'Day':<10} {'Tellers':>7} {'Arrivals':>9} {'Load':>6} {'Mean line':>10} {'Max line':>9} "
+             f"{'Mean wait':>10} {'p95 wait':>9} {'Closed at':>10}"]
+    for r in results:
+        load = f"{r['offered_load']:.0%}" if r["offered_load"] is not None else "-"
+        lines.append(f"{days[r['day']]:<10} {r['tellers']:>7} {r['arrivals']:>9} {load:>6} {r['mean_line']:>10.1f} "
+                     f"{r['max_line']:>9} {r['mean_wait']:>9.1f}m {r['p95_wait']:>8.1f}m "
+                     f"{r['last_departure'] / 60:>9.1f}h")
+    return "\n".join(lines)
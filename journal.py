@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+import storage
+
+SNAPSHOT_FILE = "snapshot.jsonl"
+
+class Journal:
+    """Append-only write-ahead log of Bank mutations, split into segments.
+
+    Entries are buffered and fsynced in groups: a commit happens once
+    commit_every entries are pending or commit_interval seconds have passed
+    since the last one, and a background thread commits whatever is still
+    pending every commit_interval seconds, so an entry followed by idle
+    time is not left unsynced. Every snapshot_every entries the bank is written to
+    snapshot.jsonl (in a forked child where the OS supports it) and the
+    segments it covers are deleted, so recovery is the snapshot plus the
+    journal tail.
+    """
+    def __init__(self, directory, commit_every=64, commit_interval=0.05, snapshot_every=100000):
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+        self.file = None
+        self.seq = 0
+        self.pending = 0
+        self.entries_since_snapshot = 0
+        self.last_commit = time.monotonic()
+        self.snapshot_pid = None
+        self.lock = threading.RLock()  # Held by writers and the flusher thread
+        self.closing = threading.Event()
+        self.flusher = None
+        os.makedirs(directory, exist_ok=True)
+
+    def segment_path(self, seq):
+        return os.path.join(self.directory, f"journal-{seq:06d}.log")
+
+    def segments(self):
+        seqs = []
+        for file_name in os.listdir(self.directory):
+            if file_name.startswith("journal-") and file_name.endswith(".log"):
+                seqs.append(int(file_name[len("journal-"):-len(".log")]))
+        return sorted(seqs)
+
+    def replay(self, from_seq=0):
+        """Yield (op, args) for every entry in segments numbered from_seq or later."""
+        for seq in self.segments():
+            if seq < from_seq:
+                continue
+            with open(self.segment_path(seq), 'r') as f:
+                for line in f:
+                    try:
+                        op, args = json.loads(line)
+                    except ValueError:
+                        break  # Torn write at the end of a segment
+                    yield op, args
+
+    def start(self):
+        """Open a fresh segment after any existing ones for new entries."""
+        existing = self.segments()
+        self._open_segment((existing[-1] if existing else 0) + 1)
+        if self.flusher is None and self.commit_interval != float("inf"):
+            self.flusher = threading.Thread(target=self._flush_pending, name="journal-flusher", daemon=True)
+            self.flusher.start()
+
+    def _flush_pending(self):
+        while not self.closing.wait(self.commit_interval):
+            with self.lock:
+                if self.pending and self.file is not None:
+                    self.commit()
+
+    def _open_segment(self, seq):
+        with self.lock:
+            if self.file is not None:
+                self.commit()
+                self.file.close()
+            self.seq = seq
+            self.file = open(self.segment_path(seq), 'a')
+
+    def append(self, op, *args):
+        line = json.dumps([op, args], separators=(',', ':')) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.pending += 1
+            self.entries_since_snapshot += 1
+            if self.pending >= self.commit_every or time.monotonic() - self.last_commit >= self.commit_interval:
+                self.commit()
+
+    def commit(self):
+        with self.lock:
+            if self.pending:
+                os.fsync(self.flush())
+            self.last_commit = time.monotonic()
+
+    def flush(self):
+        """Hand buffered entries to the OS and return the descriptor to fsync."""
+        with self.lock:
+            self.file.flush()
+            self.pending = 0
+            return self.file.fileno()
+
+    def snapshot_due(self):
+        return self.entries_since_snapshot >= self.snapshot_every
+
+    def snapshot(self, bank, wait=False, inline=False):
+        """Compact the journal into a snapshot of bank's current state.
+
+        If the previous snapshot is still being written this one is skipped,
+        unless wait is set. With inline the snapshot is written before
+        returning instead of in a forked child.
+        """
+        if self.snapshot_pid is not None:
+            pid, _ = os.waitpid(self.snapshot_pid, 0 if wait or inline else os.WNOHANG)
+            if pid == 0:
+                return False  # Previous snapshot is still being written
+            self.snapshot_pid = None
+        self._open_segment(self.seq + 1)
+        self.entries_since_snapshot = 0
+        if inline or not hasattr(os, 'fork'):
+            self._write_snapshot(bank, self.seq)
+            return True
+        pid = os.fork()
+        if pid == 0:
+            # The child owns a copy-on-write view of the bank as of now
+            status = 1
+            try:
+                self._write_snapshot(bank, self.seq)
+                status = 0
+            finally:
+                os._exit(status)
+        self.snapshot_pid = pid
+        return True
+
+    def _write_snapshot(self, bank, seq):
+        storage.write_records(self.snapshot_path, _with_journal_seq(bank.iter_records(), seq))
+        for old_seq in self.segments():
+            if old_seq < seq:
+                os.unlink(self.segment_path(old_seq))
+
+    def close(self):
+        if self.flusher is not None:
+            self.closing.set()
+            self.flusher.join()
+            self.flusher = None
+        if self.file is not None:
+            self.commit()
+            self.file.close()
+            self.file = None
+        if self.snapshot_pid is not None:
+            os.waitpid(self.snapshot_pid, 0)
+            self.snapshot_pid = None
+
+def _with_journal_seq(records, seq):
+    for kind, data in records:
+        if kind == "bank":
+            data = dict(data, journal_seq=seq)
+        yield kind, data
@@ -0,0 +1,354 @@
+import mmap
+import os
+import shutil
+import tempfile
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+
+KINDS = ["deposit", "withdrawal", "loan", "transfer"]
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+SEGMENT_SIZE = 65536  # Rows per segment
+RESIDENT_SEGMENTS = 4  # Sealed segments kept in memory before the oldest is spilled
+
+# Column layout of a segment file after its row count, 8-byte columns first so every column is aligned
+DATA_COLUMNS = (("day", "q"), ("customer_id", "q"), ("amount", "q"), ("kind", "b"))
+FILE_COLUMNS = (("day", "q"), ("customer_id", "q"), ("amount", "q"), ("order", "q"), ("kind", "b"))
+
+class Segment:
+    """A block of consecutive ledger rows held as one array per column.
+
+    Rows are appended in day order, so a day range is found by bisecting
+    the day column. While the segment is active it indexes its rows by
+    customer in a dict; sealing replaces that with "order", the row numbers
+    sorted by customer, which is bisected the same way and can be spilled
+    to disk with the rest of the columns.
+    """
+    def __init__(self):
+        self.columns = {name: array(code) for name, code in DATA_COLUMNS}
+        self.by_customer = {}  # customer id -> row numbers, until sealed
+        self.length = 0
+        self.first_day = None
+        self.last_day = None
+        self.path = None
+        self.mapped = False  # Columns are views into a file someone else mapped
+
+    def __len__(self):
+        return self.length
+
+    def append(self, day, customer_id, amount, kind):
+        columns = self.columns
+        columns["day"].append(day)
+        columns["customer_id"].append(customer_id)
+        columns["amount"].append(amount)
+        columns["kind"].append(kind)
+        self.by_customer.setdefault(customer_id, []).append(self.length)
+        if self.first_day is None:
+            self.first_day = day
+        self.last_day = day
+        self.length += 1
+
+    def seal(self):
+        if "order" not in self.columns:
+            customer_ids = self.columns["customer_id"]
+            self.columns["order"] = array('q', sorted(range(self.length), key=customer_ids.__getitem__))
+        self.by_customer = None
+
+    def spill(self, path):
+        with open(path, 'wb') as f:
+            f.write(array('q', [self.length]).tobytes())
+            for name, _ in FILE_COLUMNS:
+                self.columns[name].tofile(f)
+        self.path = path
+        self.columns = None
+
+    @contextmanager
+    def open_columns(self):
+        """Yield the columns, mapped straight from the segment file if it was spilled."""
+        if self.path is None:
+            yield self.columns
+            return
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            views = [memoryview(mm)]
+            columns = {}
+            offset = 8
+            for name, code in FILE_COLUMNS:
+                size = array(code).itemsize * self.length
+                views.append(views[0][offset:offset + size])
+                views.append(views[-1].cast(code))
+                columns[name] = views[-1]
+                offset += size
+            try:
+                yield columns
+            finally:
+                # The map can only be closed once nothing points into it
+                columns.clear()
+                for view in reversed(views):
+                    view.release()
+
+    def customer_rows(self, columns, customer_id):
+        if self.by_customer is not None:
+            return self.by_customer.get(customer_id, [])
+        customer_ids = columns["customer_id"]
+        order = columns["order"]
+        lo = bisect_left(order, customer_id, key=customer_ids.__getitem__)
+        hi = bisect_right(order, customer_id, lo, key=customer_ids.__getitem__)
+        return order[lo:hi]  # Already in row order, the sort was stable
+
+    def day_rows(self, columns, first_day, last_day):
+        days = columns["day"]
+        return range(bisect_left(days, first_day), bisect_right(days, last_day))
+
+    def resident(self):
+        """A copy of the segment with its columns back in memory."""
+        if self.path is None and not self.mapped:
+            return self
+        copy = Segment()
+        with self.open_columns() as columns:
+            copy.columns = {name: array(code, columns[name].tobytes()) for name, code in FILE_COLUMNS}
+        copy.by_customer = None
+        copy.length, copy.first_day, copy.last_day = self.length, self.first_day, self.last_day
+        return copy
+
+    def nbytes(self):
+        if self.columns is None or self.mapped:
+            return 0
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+class MappedIndex:
+    """Customer id -> segment numbers, read from columns saved with the ledger.
+
+    The columns are the customer ids in order, where each one's numbers
+    end and the numbers themselves, typically views into a mapped file. A
+    customer's numbers are copied into an array the first time they are
+    looked up, so appending to and truncating the ledger work unchanged.
+    """
+    def __init__(self, customer_ids, ends, numbers):
+        self.customer_ids = customer_ids
+        self.ends = ends
+        self.numbers = numbers
+        self.loaded = {}  # customer id -> numbers looked up or changed since opening
+
+    def get(self, customer_id, default=None):
+        numbers = self.loaded.get(customer_id)
+        if numbers is None:
+            row = bisect_left(self.customer_ids, customer_id)
+            if row == len(self.customer_ids) or self.customer_ids[row] != customer_id:
+                return default
+            numbers = self.loaded[customer_id] = array('l', self.numbers[self.ends[row]:self.ends[row + 1]])
+        return numbers
+
+    def __getitem__(self, customer_id):
+        numbers = self.get(customer_id)
+        if numbers is None:
+            raise KeyError(customer_id)
+        return numbers
+
+    def __setitem__(self, customer_id, numbers):
+        self.loaded[customer_id] = numbers
+
+    def __delitem__(self, customer_id):
+        self.loaded[customer_id] = array('l')  # Hides the saved numbers
+
+    def to_dict(self):
+        index = {customer_id: array('l', self.numbers[self.ends[row]:self.ends[row + 1]])
+                 for row, customer_id in enumerate(self.customer_ids)}
+        index.update(self.loaded)
+        return {customer_id: numbers for customer_id, numbers in index.items() if numbers}
+
+def _entry(columns, row):
+    return (columns["day"][row], columns["customer_id"][row], columns["amount"][row], KINDS[columns["kind"][row]])
+
+class Ledger:
+    """Bank-wide append-only record of (day, customer id, amount, kind) entries.
+
+    Entries go into fixed-size columnar segments. Each customer maps to the
+    segments that hold their entries, and each segment can be bisected by
+    day or by customer, so a statement for a day range only touches the
+    segments and rows it needs. Given a directory, sealed segments beyond
+    the newest resident_segments are spilled to files there and mapped
+    back in only while a query reads them, which keeps memory bounded.
+    """
+    def __init__(self, directory=None, segment_size=SEGMENT_SIZE, resident_segments=RESIDENT_SEGMENTS):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.resident_segments = resident_segments
+        self.spill_path = None
+        self._cleanup = None
+        self.clear()
+
+    def clear(self):
+        if self._cleanup is not None:
+            self._cleanup()  # Delete this ledger's spilled segments
+        self.spill_path = None
+        self._cleanup = None
+        self.segments = [Segment()]  # The last segment is the one being appended to
+        self.spilled = 0  # Segments before this one live on disk
+        self.customer_segments = {}  # customer id -> numbers of the segments holding their entries
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Copies get their own spill files, so bring spilled segments back into memory
+        state["segments"] = [segment.resident() for segment in self.segments]
+        if isinstance(self.customer_segments, MappedIndex):
+            state["customer_segments"] = self.customer_segments.to_dict()
+        state["spilled"] = 0
+        state["spill_path"] = None
+        state["_cleanup"] = None
+        return state
+
+    def record(self, day, customer_id, amount, kind):
+        segment = self.segments[-1]
+        if len(segment) >= self.segment_size:
+            self._seal()
+            segment = self.segments[-1]
+        self._index(customer_id, len(self.segments) - 1)
+        segment.append(day, customer_id, amount, KIND_CODES[kind])
+        self.length += 1
+
+    def _index(self, customer_id, number):
+        numbers = self.customer_segments.get(customer_id)
+        if numbers is None:
+            numbers = self.customer_segments[customer_id] = array('l')
+        if not numbers or numbers[-1] != number:
+            numbers.append(number)
+
+    def _seal(self):
+        self.segments[-1].seal()
+        self.segments.append(Segment())
+        if self.directory is None:
+            return
+        while len(self.segments) - 1 - self.spilled > self.resident_segments:
+            if self.spill_path is None:
+                self.spill_path = tempfile.mkdtemp(prefix="ledger-", dir=self.directory)
+                self._cleanup = weakref.finalize(self, shutil.rmtree, self.spill_path, True)
+            self.segments[self.spilled].spill(os.path.join(self.spill_path, f"segment-{self.spilled:06d}.bin"))
+            self.spilled += 1
+
+    def statement(self, customer_id, first_day=None, last_day=None):
+        """Entries for one customer between two days inclusive, oldest first."""
+        first_day = float("-inf") if first_day is None else first_day
+        last_day = float("inf") if last_day is None else last_day
+        entries = []
+        for number in self.customer_segments.get(customer_id, ()):
+            segment = self.segments[number]
+            if segment.last_day < first_day or segment.first_day > last_day:
+                continue
+            with segment.open_columns() as columns:
+                days = columns["day"]
+                entries.extend(_entry(columns, row) for row in segment.customer_rows(columns, customer_id)
+                               if first_day <= days[row] <= last_day)
+        return entries
+
+    def day_entries(self, first_day, last_day=None):
+        """Every entry from first_day to last_day inclusive, oldest first."""
+        last_day = first_day if last_day is None else last_day
+        entries = []
+        for segment in self.segments:
+            if not segment.length or segment.last_day < first_day or segment.first_day > last_day:
+                continue
+            with segment.open_columns() as columns:
+                entries.extend(_entry(columns, row) for row in segment.day_rows(columns, first_day, last_day))
+        return entries
+
+    def truncate(self, length):
+        """Drop every entry after the first length, reopening the segment the cut falls in."""
+        if length >= self.length:
+            return
+        start = 0
+        for number, segment in enumerate(self.segments):
+            if length < start + segment.length:
+                break
+            start += segment.length
+        dropped = set()
+        reopened = Segment()
+        for segment in self.segments[number:]:
+            with segment.open_columns() as columns:
+                dropped.update(columns["customer_id"])
+                if segment is self.segments[number]:
+                    for row in range(length - start):
+                        reopened.append(columns["day"][row], columns["customer_id"][row],
+                                        columns["amount"][row], columns["kind"][row])
+        self.segments[number:] = [reopened]
+        self.spilled = min(self.spilled, number)
+        self.length = length
+        for customer_id in dropped:
+            numbers = self.customer_segments[customer_id]
+            while numbers and numbers[-1] >= number:
+                numbers.pop()
+            if not numbers:
+                del self.customer_segments[customer_id]
+        for customer_id in reopened.by_customer:
+            self._index(customer_id, number)
+
+    def segment_count(self):
+        return len(self.segments)
+
+    def segment_data(self, number):
+        """One segment's columns as lists, the form used in save files."""
+        with self.segments[number].open_columns() as columns:
+            return {name: columns[name].tolist() for name, _ in DATA_COLUMNS}
+
+    def iter_segments(self):
+        for number, segment in enumerate(self.segments):
+            if segment.length:
+                yield self.segment_data(number)
+
+    def load_segment(self, data):
+        """Append a segment saved by segment_data, sealing it as it is.
+
+        Columns may be lists, arrays or memoryviews, and a precomputed
+        "order" column is used as is.
+        """
+        if self.segments[-1].length:
+            self._seal()
+        segment = self.segments[-1]
+        for name, code in FILE_COLUMNS:
+            if name in data:
+                column = data[name]
+                segment.columns[name] = array(code, column if isinstance(column, list) else bytes(column))
+        days = segment.columns["day"]
+        segment.length = len(days)
+        if not segment.length:
+            return
+        segment.first_day, segment.last_day = days[0], days[-1]
+        number = len(self.segments) - 1
+        for customer_id in dict.fromkeys(segment.columns["customer_id"]):
+            self._index(customer_id, number)
+        self.length += segment.length
+        self._seal()
+
+    def open_mapped(self, segments, index):
+        """Replace the ledger with sealed segments viewed in place and their MappedIndex.
+
+        segments are dicts of FILE_COLUMNS views such as the sections of a
+        mapped snapshot. Nothing is copied or scanned, so this costs the
+        same however long the ledger is.
+        """
+        self.clear()
+        mapped = []
+        for columns in segments:
+            segment = Segment()
+            segment.columns = columns
+            segment.by_customer = None
+            segment.mapped = True
+            segment.length = len(columns["day"])
+            if segment.length:
+                segment.first_day, segment.last_day = columns["day"][0], columns["day"][-1]
+            mapped.append(segment)
+            self.length += segment.length
+        self.segments[:0] = mapped
+        self.spilled = len(mapped)  # Already on disk, never spilled again
+        self.customer_segments = index
+
+    def resident_bytes(self):
+        index = self.customer_segments
+        if isinstance(index, MappedIndex):
+            index = index.loaded  # The rest is read from the map
+        size = sum(numbers.itemsize * len(numbers) for numbers in index.values())
+        return size + sum(segment.nbytes() for segment in self.segments)
@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import random
+import time
+
+async def setup_accounts(host, port, accounts):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write("".join(f"add_customer,Load {i},30,1000.0,3000\n" for i in range(accounts)).encode())
+    await writer.drain()
+    for _ in range(accounts):
+        await reader.readline()
+    writer.close()
+
+async def client(host, port, accounts, requests, pipeline, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for _ in range(requests // pipeline):
+        lines = []
+        for _ in range(pipeline):
+            op = random.choice(("deposit", "withdraw"))
+            lines.append(f"{op},Load {random.randrange(accounts)},{random.randint(1, 100)}\n")
+        start = time.perf_counter()
+        writer.write("".join(lines).encode())
+        for _ in range(pipeline):
+            await reader.readline()
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+async def run(args):
+    await setup_accounts(args.host, args.port, args.accounts)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args.host, args.port, args.accounts, args.requests, args.pipeline, latencies)
+                           for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    total = len(latencies) * args.pipeline
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+    print(f"{total} requests over {args.connections} connections in {elapsed:.2f} s")
+    print(f"{total / elapsed:,.0f} requests/s, p50 {p50 * 1e3:.2f} ms, p99 {p99 * 1e3:.2f} ms per round trip")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput and latency of server.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=100, help="requests per connection")
+    parser.add_argument("--pipeline", type=int, default=1, help="requests sent per round trip")
+    parser.add_argument("--accounts", type=int, default=10000)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
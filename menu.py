@@ -1,6 +1,11 @@
 import os
 import sys
+import batch
+import intraday
+import metrics
+import reports
 from bank import Bank
+from money import to_cents, format_money
 from employee import Employee
 from customer import Customer
 
@@ -36,6 +41,9 @@ def print_menu(bank):
     print("11. Save Data")
     print("12. Load Data")
     print("13. Banking Bonuses")  # New option for Banking Bonuses
+    print("14. Open Journal Directory")
+    print("15. Performance Stats")
+    print("16. Simulate a Week of Branch Traffic")
     print("0. Exit")
 
 def view_employee(bank):
@@ -43,14 +51,14 @@ def view_employee(bank):
     
     # Print list of employees
     print("List of Employees:")
-    for idx, employee in enumerate(bank.employees, start=1):
+    for idx, employee in enumerate(bank.employees.values(), start=1):
         print(f"{idx}. {employee.name}")
     
     choice = input("Enter the number of the employee to view: ")
     try:
         choice = int(choice)
         if 1 <= choice <= len(bank.employees):
-            employee = bank.employees[choice - 1]
+            employee = list(bank.employees.values())[choice - 1]
             print("Selected Employee:", employee.name)
             
             # Display all employee data
@@ -58,7 +66,7 @@ def view_employee(bank):
             print(f"Name: {employee.name}")
             print(f"Age: {employee.age}")
             print(f"Position: {employee.position}")
-            print(f"Hourly Rate: {employee.hourly_rate}")
+            print(f"Hourly Rate: {format_money(employee.hourly_rate)}")
             print(f"Days Employed: {employee.days_employed}")
             print(f"Employee Rating: {employee.employee_rating}")
             print(f"Hours Worked/Week: {employee.hours_worked_week}")
@@ -89,6 +97,25 @@ def banking_bonuses(bank):
     except ValueError:
         print("Invalid input. Please enter a number.")
 
+def performance_stats(bank):
+    print("\nInstrumentation is", "on" if metrics.enabled() else "off")
+    print(metrics.format_table(bank))
+    print("\n1. Turn Instrumentation On/Off")
+    print("2. Export Prometheus Metrics")
+    print("3. Reset Stats")
+    choice = input("Choose an option (Enter to go back): ")
+    if choice == "1":
+        if metrics.enabled():
+            metrics.disable()
+        else:
+            metrics.enable()
+    elif choice == "2":
+        file_path = input("Enter file path for the metrics: ")
+        metrics.write_prometheus(file_path, bank)
+        print("Metrics written.")
+    elif choice == "3":
+        metrics.reset()
+
 def main():
     bank = Bank()
     while True:
@@ -100,7 +127,7 @@ def main():
             name = input("Enter employee name: ")
             age = int(input("Enter employee age: "))
             position = input("Enter employee position: ")
-            hourly_rate = float(input("Enter employee hourly rate: "))
+            hourly_rate = to_cents(input("Enter employee hourly rate: "))
             bank.hire_employee(Employee(name, age, position, hourly_rate))
         elif choice == "2":
             name = input("Enter employee name to fire: ")
@@ -110,8 +137,8 @@ def main():
         elif choice == "4":
             name = input("Enter customer name: ")
             age = int(input("Enter customer age: "))
-            balance = float(input("Enter customer balance: "))
-            monthly_income = float(input("Enter customer monthly income: "))
+            balance = to_cents(input("Enter customer balance: "))
+            monthly_income = to_cents(input("Enter customer monthly income: "))
             bank.add_customer(Customer(name, age, balance, monthly_income))
         elif choice == "5":
             view_edit_customer_info(bank)
@@ -123,9 +150,9 @@ def main():
         elif choice == "8":
             print("Employees working today:", bank.get_employees_working_on_day(bank.day_of_week))
         elif choice == "9":
-            print("Weekly Report:", bank.generate_weekly_report())
+            print(reports.format_report(bank.generate_weekly_report()))
         elif choice == "10":
-            print("Bank Balance:", bank.balance)
+            print("Bank Balance:", format_money(bank.balance))
         elif choice == "11":
             file_path = input("Enter file path to save data: ")
             bank.save_data(file_path)
@@ -136,7 +163,16 @@ def main():
             print("Data loaded.")
         elif choice == "13":
             banking_bonuses(bank)
+        elif choice == "14":
+            directory = input("Enter journal directory: ")
+            bank.open_journal(directory)
+            print("Journal opened. Every change is now saved automatically.")
+        elif choice == "15":
+            performance_stats(bank)
+        elif choice == "16":
+            print(intraday.format_results(intraday.simulate_week(bank)))
         elif choice == "0":
+            bank.close_journal()
             sys.exit()  # Exit the program
         else:
             print("Invalid choice. Please try again.")
@@ -144,5 +180,8 @@ def main():
         input("\nPress Enter to continue...")
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ["--batch"]:
+        batch.main(sys.argv[2:])  # Read commands from a file or stdin, no prompts
+    else:
+        main()
 
@@ -0,0 +1,167 @@
+import cProfile
+import functools
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from bank import Bank
+
+# Bank methods that get timed while instrumentation is enabled
+OPERATIONS = [
+    "advance_day", "advance_days", "hire_employee", "hire_employees_bulk", "fire_employee", "assign_schedule",
+    "add_customer", "add_customers_bulk", "set_customer_income",
+    "customer_deposit", "customer_withdraw", "customer_transfer",
+    "issue_loan", "open_credit_card", "charge_credit_card",
+    "save_data", "load_data", "open_journal", "open_database", "open_snapshot", "checkpoint", "rewind",
+]
+BUCKETS = 26  # Powers of two from 1 microsecond to about 33 seconds, then +Inf
+
+class Histogram:
+    """Latency counts in power-of-two microsecond buckets."""
+    def __init__(self):
+        self.counts = [0] * (BUCKETS + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[min(int(seconds * 1e6).bit_length(), BUCKETS)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile, capped at the max."""
+        target = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return min(bucket_bound(bucket), self.max)
+        return self.max
+
+def bucket_bound(bucket):
+    return float("inf") if bucket >= BUCKETS else (1 << bucket) / 1e6
+
+stats = {}  # operation -> Histogram
+_originals = {}
+
+def enabled():
+    return bool(_originals)
+
+def enable():
+    """Swap timed wrappers in for the Bank operations. Disabled, they cost nothing."""
+    for name in OPERATIONS:
+        if name not in _originals:
+            _originals[name] = getattr(Bank, name)
+            setattr(Bank, name, _timed(name, _originals[name]))
+
+def disable():
+    for name, original in _originals.items():
+        setattr(Bank, name, original)
+    _originals.clear()
+
+def reset():
+    stats.clear()
+
+def _timed(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            histogram = stats.get(name)
+            if histogram is None:
+                histogram = stats[name] = Histogram()
+            histogram.observe(time.perf_counter() - start)
+    return wrapper
+
+def object_counts(bank):
+    return {
+        "customers": len(bank.customers),
+        "employees": len(bank.employees),
+        "loans": len(bank.portfolio.principals),
+        "ledger_entries": len(bank.ledger),
+    }
+
+def memory_breakdown(bank):
+    """Bytes held by customer objects, their transactions, loans and cards, and the ledger in memory."""
+    sizes = {"customers": 0, "transactions": 0, "loans": 0, "credit_cards": 0}
+    for customer in bank.customers.values():
+        sizes["customers"] += sys.getsizeof(customer)
+        if customer.transactions:
+            sizes["transactions"] += sys.getsizeof(customer.transactions)
+            sizes["transactions"] += sum(sys.getsizeof(amount) for amount in customer.transactions)
+        for field in ("loans", "credit_cards"):
+            records = getattr(customer, field)
+            if records:
+                sizes[field] += sys.getsizeof(records)
+                for record in records:
+                    sizes[field] += sys.getsizeof(record) + sum(sys.getsizeof(v) for v in record.values())
+    sizes["ledger"] = bank.ledger.resident_bytes()
+    return sizes
+
+def format_table(bank=None):
+    lines = [f"{'Operation':<20} {'Count':>9} {'Total (s)':>10} {'Mean (us)':>11} {'p50 (us)':>10} {'p99 (us)':>10} {'Max (us)':>11}"]
+    for name, histogram in sorted(stats.items()):
+        lines.append(f"{name:<20} {histogram.count:>9} {histogram.total:>10.3f} "
+                     f"{histogram.total / histogram.count * 1e6:>11.1f} {histogram.quantile(0.5) * 1e6:>10.0f} "
+                     f"{histogram.quantile(0.99) * 1e6:>10.0f} {histogram.max * 1e6:>11.1f}")
+    if bank is not None:
+        lines.append("")
+        for kind, count in object_counts(bank).items():
+            lines.append(f"{kind:<20} {count:>9}")
+        sizes = memory_breakdown(bank)
+        total = sum(sizes.values()) or 1
+        for kind, size in sizes.items():
+            lines.append(f"{kind + ' memory':<20} {size:>9} bytes ({size / total:.0%})")
+    return "\n".join(lines)
+
+def format_prometheus(bank=None):
+    lines = ["# TYPE bank_operation_seconds histogram"]
+    for name, histogram in sorted(stats.items()):
+        seen = 0
+        for bucket, count in enumerate(histogram.counts):
+            seen += count
+            bound = "+Inf" if bucket >= BUCKETS else repr(bucket_bound(bucket))
+            lines.append(f'bank_operation_seconds_bucket{{operation="{name}",le="{bound}"}} {seen}')
+        lines.append(f'bank_operation_seconds_sum{{operation="{name}"}} {histogram.total}')
+        lines.append(f'bank_operation_seconds_count{{operation="{name}"}} {histogram.count}')
+    if bank is not None:
+        lines.append("# TYPE bank_objects gauge")
+        for kind, count in object_counts(bank).items():
+            lines.append(f'bank_objects{{kind="{kind}"}} {count}')
+        lines.append("# TYPE bank_memory_bytes gauge")
+        for kind, size in memory_breakdown(bank).items():
+            lines.append(f'bank_memory_bytes{{kind="{kind}"}} {size}')
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(file_path, bank=None):
+    with open(file_path, 'w') as f:
+        f.write(format_prometheus(bank))
+
+@contextmanager
+def profile(file_path=None):
+    """Run the body under cProfile, dumping the stats to file_path if given."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if file_path:
+            profiler.dump_stats(file_path)
+
+@contextmanager
+def trace_memory(top=10):
+    """Run the body under tracemalloc and fill the yielded dict with the peak and top allocation sites."""
+    report = {}
+    tracemalloc.start()
+    try:
+        yield report
+    finally:
+        report["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        report["top"] = [str(stat) for stat in tracemalloc.take_snapshot().statistics('lineno')[:top]]
+        tracemalloc.stop()
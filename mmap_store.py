@@ -0,0 +1,271 @@
+import json
+import mmap
+from array import array
+from bisect import bisect_left, bisect_right
+from atomic import atomic_write
+from customer import Customer
+from ledger import MappedIndex
+from reports import BalanceSketch
+
+MAGIC = b"BANKSNP1"
+VERSION = 2  # Money in integer cents
+EXTENSIONS = (".snapshot", ".snap")
+EXTRA_FIELDS = ("transactions", "loans", "credit_cards")  # Variable-length fields, kept as JSON
+LEDGER_COLUMNS = (("day", "q"), ("customer_id", "q"), ("amount", "q"), ("order", "q"), ("kind", "b"))
+
+def is_snapshot(file_path):
+    return file_path.endswith(EXTENSIONS)
+
+def write_records(file_path, records):
+    """Atomically write (kind, data) records as a binary snapshot.
+
+    The file is the magic number, the length of a JSON header, the header
+    (bank header, employees, totals, the balance sketch and where each
+    section starts), then the sections: fixed-width customer columns sorted
+    by id, name and extra-field string tables with their end offsets, the
+    customer rows sorted by name, the ledger segments and the index of the
+    segments holding each customer's entries. Every section
+    starts on an 8-byte boundary so it can be viewed in place once mapped.
+    """
+    header = {}
+    employees = []
+    ledger = []
+    ids, ages = array('q'), array('q')
+    balances, incomes = array('q'), array('q')
+    names, extras = bytearray(), bytearray()
+    name_ends, extra_ends = array('q', [0]), array('q', [0])
+    credit = array('q')
+    sketch = BalanceSketch()
+    for kind, data in records:
+        if kind == "bank":
+            header = data
+        elif kind == "employee":
+            employees.append(data)
+        elif kind == "ledger":
+            ledger.append(data)
+        elif kind == "customer":
+            if data.get("loans") or data.get("credit_cards"):
+                credit.append(data["id"])
+            ids.append(data["id"])
+            ages.append(data["age"])
+            balances.append(data["balance"])
+            incomes.append(data["monthly_income"])
+            names += data["name"].encode()
+            name_ends.append(len(names))
+            extra = {field: data[field] for field in EXTRA_FIELDS if data.get(field)}
+            if extra:
+                extras += json.dumps(extra, separators=(',', ':')).encode()
+            extra_ends.append(len(extras))
+            sketch.add(data["balance"])
+    if any(ids[row] >= ids[row + 1] for row in range(len(ids) - 1)):
+        ids, ages, balances, incomes, names, name_ends, extras, extra_ends = _sort_by_id(
+            ids, ages, balances, incomes, names, name_ends, extras, extra_ends)
+    name_order = array('q', sorted(range(len(ids)), key=lambda row: names[name_ends[row]:name_ends[row + 1]]))
+
+    sections = [("ids", ids), ("ages", ages), ("balances", balances), ("monthly_incomes", incomes),
+                ("name_ends", name_ends), ("extra_ends", extra_ends), ("name_order", name_order),
+                ("credit", credit), ("names", array('B', names)), ("extras", array('B', extras))]
+    ledger_index = {}  # customer id -> numbers of the segments holding their entries
+    for number, data in enumerate(ledger):
+        customer_ids = data["customer_id"]
+        data = dict(data, order=sorted(range(len(customer_ids)), key=customer_ids.__getitem__))
+        sections += [(f"ledger_{number}_{name}", array(code, data[name])) for name, code in LEDGER_COLUMNS]
+        for customer_id in dict.fromkeys(customer_ids):
+            ledger_index.setdefault(customer_id, []).append(number)
+    index_ids, index_ends, index_numbers = array('q'), array('q', [0]), array('q')
+    for customer_id in sorted(ledger_index):
+        index_ids.append(customer_id)
+        index_numbers.extend(ledger_index[customer_id])
+        index_ends.append(len(index_numbers))
+    sections += [("ledger_index_ids", index_ids), ("ledger_index_ends", index_ends),
+                 ("ledger_index_numbers", index_numbers)]
+    meta = {
+        "version": VERSION,
+        "bank": header,
+        "employees": employees,
+        "customers": len(ids),
+        "next_customer_id": (max(ids) + 1) if ids else 1,
+        "total_monthly_income": sum(incomes),
+        "balance_sketch": sketch.to_dict(),
+        "ledger_segments": len(ledger),
+        "sections": {}
+    }
+    # Section offsets depend on the header's length, so lay the sections out twice
+    offset = 0
+    for _ in range(2):
+        header_bytes = json.dumps(meta, separators=(',', ':')).encode()
+        offset = _align(len(MAGIC) + 8 + len(header_bytes) + 64 + 16 * len(sections))
+        for name, column in sections:
+            meta["sections"][name] = [offset, column.typecode, len(column)]
+            offset = _align(offset + column.itemsize * len(column))
+    header_bytes = json.dumps(meta, separators=(',', ':')).encode()
+    with atomic_write(file_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(array('q', [len(header_bytes)]).tobytes())
+        f.write(header_bytes)
+        for name, column in sections:
+            f.write(bytes(meta["sections"][name][0] - f.tell()))
+            column.tofile(f)
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+def _sort_by_id(ids, ages, balances, incomes, names, name_ends, extras, extra_ends):
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    sorted_names, sorted_extras = bytearray(), bytearray()
+    sorted_name_ends, sorted_extra_ends = array('q', [0]), array('q', [0])
+    for row in order:
+        sorted_names += names[name_ends[row]:name_ends[row + 1]]
+        sorted_name_ends.append(len(sorted_names))
+        sorted_extras += extras[extra_ends[row]:extra_ends[row + 1]]
+        sorted_extra_ends.append(len(sorted_extras))
+    return (array('q', (ids[row] for row in order)), array('q', (ages[row] for row in order)),
+            array('q', (balances[row] for row in order)), array('q', (incomes[row] for row in order)),
+            sorted_names, sorted_name_ends, sorted_extras, sorted_extra_ends)
+
+def read_records(file_path):
+    """Yield (kind, data) records from a snapshot, building every customer."""
+    snapshot = MappedSnapshot(file_path)
+    yield "bank", snapshot.header["bank"]
+    for data in snapshot.header["employees"]:
+        yield "employee", data
+    for row in range(snapshot.count):
+        yield "customer", snapshot.customer(row).to_dict()
+    for number in range(snapshot.header["ledger_segments"]):
+        yield "ledger", {name: column.tolist() for name, column in snapshot.ledger_segment(number).items()}
+
+class MappedSnapshot:
+    """A snapshot file mapped read-only, with its sections viewed in place.
+
+    Opening reads only the JSON header; the columns are memoryviews over
+    the map, so balances and incomes can be summed or handed to NumPy
+    without copying and a customer is built only when asked for by row.
+    Pickling reopens the file by path instead of copying the map.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{file_path} is not a bank snapshot")
+        start = len(MAGIC) + 8
+        header_size = array('q', self.map[len(MAGIC):start])[0]
+        self.header = json.loads(self.map[start:start + header_size])
+        view = memoryview(self.map)
+        self.sections = {name: view[offset:offset + array(code).itemsize * length].cast(code)
+                         for name, (offset, code, length) in self.header["sections"].items()}
+        self.count = self.header["customers"]
+        self.ids = self.sections["ids"]
+        self.balances = self.sections["balances"]
+        self.monthly_incomes = self.sections["monthly_incomes"]
+
+    def __reduce__(self):
+        return MappedSnapshot, (self.file_path,)
+
+    def row_of(self, customer_id):
+        row = bisect_left(self.ids, customer_id)
+        return row if row < self.count and self.ids[row] == customer_id else None
+
+    def name(self, row):
+        ends = self.sections["name_ends"]
+        return bytes(self.sections["names"][ends[row]:ends[row + 1]]).decode()
+
+    def customer(self, row):
+        customer = Customer(self.name(row), self.sections["ages"][row], self.balances[row], self.monthly_incomes[row])
+        customer.id = self.ids[row]
+        ends = self.sections["extra_ends"]
+        if ends[row] != ends[row + 1]:
+            extra = json.loads(bytes(self.sections["extras"][ends[row]:ends[row + 1]]))
+            for amount in extra.get("transactions", ()):
+                customer.add_transaction(amount)
+            if extra.get("loans"):
+                customer.loans = extra["loans"]
+            if extra.get("credit_cards"):
+                customer.credit_cards = extra["credit_cards"]
+        return customer
+
+    def ids_named(self, name):
+        """Ids of the customers called name, in id order, found by bisecting the name index."""
+        target = name.encode()
+        names, ends, order = self.sections["names"], self.sections["name_ends"], self.sections["name_order"]
+        key = lambda row: names[ends[row]:ends[row + 1]].tobytes()
+        lo = bisect_left(order, target, key=key)
+        hi = bisect_right(order, target, lo, key=key)
+        return [self.ids[row] for row in order[lo:hi]]
+
+    def ledger_segment(self, number):
+        return {name: self.sections[f"ledger_{number}_{name}"] for name, _ in LEDGER_COLUMNS}
+
+    def ledger_index(self):
+        """The MappedIndex of customers' ledger segments, or None for snapshots saved without one."""
+        if "ledger_index_ids" not in self.sections:
+            return None
+        return MappedIndex(self.sections["ledger_index_ids"], self.sections["ledger_index_ends"],
+                           self.sections["ledger_index_numbers"])
+
+class MappedCustomers:
+    """Dict-like view of a snapshot's customers keyed by id.
+
+    Customers are built from the map the first time they are looked up and
+    kept from then on, so changes to them stick. Customers added after
+    opening are kept alongside them.
+    """
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.loaded = {}  # id -> Customer looked up or added since opening
+        self.added = []  # ids of customers that are not in the snapshot
+
+    def get(self, customer_id, default=None):
+        customer = self.loaded.get(customer_id)
+        if customer is not None:
+            return customer
+        row = self.snapshot.row_of(customer_id)
+        if row is None:
+            return default
+        customer = self.loaded[customer_id] = self.snapshot.customer(row)
+        return customer
+
+    def __getitem__(self, customer_id):
+        customer = self.get(customer_id)
+        if customer is None:
+            raise KeyError(customer_id)
+        return customer
+
+    def __setitem__(self, customer_id, customer):
+        if customer_id not in self:
+            self.added.append(customer_id)
+        self.loaded[customer_id] = customer
+
+    def __contains__(self, customer_id):
+        return customer_id in self.loaded or self.snapshot.row_of(customer_id) is not None
+
+    def __len__(self):
+        return self.snapshot.count + len(self.added)
+
+    def __iter__(self):
+        yield from self.snapshot.ids
+        yield from self.added
+
+    def values(self):
+        # Stream without keeping what is built so a full pass stays small
+        for row, customer_id in enumerate(self.snapshot.ids):
+            customer = self.loaded.get(customer_id)
+            yield customer if customer is not None else self.snapshot.customer(row)
+        for customer_id in self.added:
+            yield self.loaded[customer_id]
+
+class MappedNames:
+    """Name -> [ids] lookups answered from the snapshot's name index plus later additions."""
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.added = {}  # name -> ids of customers added since opening
+
+    def get(self, name, default=None):
+        ids = self.snapshot.ids_named(name) + self.added.get(name, [])
+        return ids or default
+
+    def __contains__(self, name):
+        return bool(self.get(name))
+
+    def setdefault(self, name, default):
+        return self.added.setdefault(name, default)
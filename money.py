@@ -0,0 +1,138 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, fall back to Python integers
+    np = None
+
+MONEY_UNIT = "cents"  # Marks save files and journals whose amounts are integer cents
+CENTS = 100
+DAYS_PER_MONTH = 30  # Monthly income accrues over 30 days
+VECTOR_DAYS = 64  # Accrue with NumPy from this many days on
+INT64_LIMIT = 2 ** 62  # Keep NumPy totals well inside int64
+
+# Arguments of journal ops that are amounts of money, by position
+MONEY_ARGS = {
+    "customer_deposit": (1,),
+    "customer_withdraw": (1,),
+    "customer_transfer": (2,),
+    "transfer_out": (1,),
+    "transfer_in": (1,),
+    "set_customer_income": (1,),
+    "issue_loan": (1,),
+    "open_credit_card": (1,),
+    "charge_credit_card": (1,),
+    "advance_day": (0,),
+    "advance_days": (1,)
+}
+
+def to_cents(amount):
+    """Whole cents in an amount of dollars given as an int, float, Decimal or string, rounding half to even."""
+    try:
+        cents = Decimal(str(amount)).scaleb(2).quantize(Decimal(1), ROUND_HALF_EVEN)
+    except InvalidOperation:
+        cents = None
+    if cents is None or not cents.is_finite():
+        raise ValueError(f"invalid amount of money: {amount!r}")
+    return int(cents)
+
+def to_dollars(cents):
+    """The exact Decimal amount of dollars in cents."""
+    return Decimal(round(cents)).scaleb(-2)
+
+def format_money(cents):
+    cents = round(cents)
+    sign = "-" if cents < 0 else ""
+    dollars, cents = divmod(abs(cents), CENTS)
+    return f"{sign}${dollars:,}.{cents:02d}"
+
+def accrue(monthly, carry, days):
+    """Exact daily accrual of a monthly amount over days, as (amount per day, carry).
+
+    After k days (carry + monthly * k) // 30 whole cents have accrued, so
+    each day pays the step between two of those totals and the remainder,
+    under one day's worth of a cent, is carried into the next call.
+    """
+    total = carry + monthly * days
+    if np is not None and days >= VECTOR_DAYS and abs(total) < INT64_LIMIT:
+        totals = (np.arange(days + 1, dtype=np.int64) * monthly + carry) // DAYS_PER_MONTH
+        return np.diff(totals).tolist(), total % DAYS_PER_MONTH
+    totals = [(carry + monthly * k) // DAYS_PER_MONTH for k in range(days + 1)]
+    return [b - a for a, b in zip(totals, totals[1:])], total % DAYS_PER_MONTH
+
+def running_balance(start, incomes, expenses, repayments):
+    """Balance after each day of incomes less expenses plus repayments, all in cents."""
+    if np is not None and len(incomes) >= VECTOR_DAYS:
+        nets = (np.array(incomes, dtype=np.int64) - np.array(expenses, dtype=np.int64)
+                + np.array(repayments, dtype=np.int64))
+        bound = abs(start) + int(np.abs(nets).sum())
+        if bound < INT64_LIMIT:
+            return (np.cumsum(nets) + start).tolist()
+    nets = (income - expense + repayment for income, expense, repayment in zip(incomes, expenses, repayments))
+    return list(accumulate(nets, initial=start))[1:]
+
+def is_current(header):
+    return header.get("money") == MONEY_UNIT
+
+def migrate_record(kind, data):
+    """A save file record written with float dollars, in integer cents."""
+    if kind == "bank":
+        return migrate_header(data)
+    if kind == "customer":
+        return migrate_customer(data)
+    if kind == "employee":
+        return dict(data, hourly_rate=to_cents(data["hourly_rate"]))
+    if kind == "ledger":
+        return dict(data, amount=[to_cents(amount) for amount in data["amount"]])
+    return data
+
+def migrate_customer(data):
+    data = dict(data, balance=to_cents(data["balance"]), monthly_income=to_cents(data["monthly_income"]))
+    data["transactions"] = [to_cents(amount) for amount in data.get("transactions", ())]
+    data["loans"] = [dict(loan, amount=to_cents(loan["amount"])) for loan in data.get("loans", ())]
+    cards = []
+    for card in data.get("credit_cards", ()):
+        card = dict(card, limit=to_cents(card["limit"]))
+        if "balance" in card:
+            card["balance"] = card["balance"] * CENTS  # Accrues interest, so kept in fractional cents
+        cards.append(card)
+    data["credit_cards"] = cards
+    return data
+
+def migrate_header(header):
+    header = dict(header, balance=to_cents(header["balance"]))
+    reports = header.get("reports")
+    if reports:
+        header["reports"] = {
+            "days": [row[:2] + [to_cents(value) for value in row[2:]] for row in reports.get("days", [])],
+            "weeks": [_migrate_week(week) for week in reports.get("weeks", [])],
+            "week": _migrate_week(reports.get("week"))
+        }
+    return header
+
+def _migrate_week(week):
+    if week is None:
+        return None
+    week = dict(week)
+    for key in ("income", "expenses", "repayments", "net", "closing_balance"):
+        if week.get(key) is not None:
+            week[key] = to_cents(week[key])
+    for key in ("income_by_weekday", "expenses_by_weekday"):
+        week[key] = [to_cents(value) for value in week[key]]
+    return week
+
+def migrate_op(op, args):
+    """Arguments of a journal entry written with float dollars, in integer cents."""
+    args = list(args)
+    for position in MONEY_ARGS.get(op, ()):
+        args[position] = to_cents(args[position])
+    if op == "add_customer":
+        args[0] = migrate_customer(args[0])
+    elif op == "add_customers":
+        args[0] = [migrate_customer(data) for data in args[0]]
+    elif op == "hire_employee":
+        args[0] = migrate_record("employee", args[0])
+    elif op == "hire_employees":
+        args[0] = [migrate_record("employee", data) for data in args[0]]
+    return args
@@ -0,0 +1,203 @@
+import multiprocessing
+import os
+import zlib
+from bank import Bank
+import reports
+
+def _serve(connection, banks):
+    """Worker process loop: apply batches of (branch, name, args) calls to the banks it hosts.
+
+    name is a method or attribute of the bank, or a dotted path to one such
+    as "reports.history"; attributes are returned as they are.
+    """
+    while True:
+        calls = connection.recv()
+        if calls is None:
+            break
+        results = []
+        for branch, method, args in calls:
+            try:
+                attribute = banks[branch]
+                for part in method.split("."):
+                    attribute = getattr(attribute, part)
+                results.append((True, attribute(*args) if callable(attribute) else attribute))
+            except Exception as e:
+                results.append((False, e))
+        connection.send(results)
+    connection.close()
+
+class BankNetwork:
+    """Branches of one bank, each a Bank of its own living in a worker process.
+
+    Customers and employees belong to the branch picked by a hash of their
+    name, so any request can be routed without a directory. Branches are
+    spread over the workers and stay there; a network-wide call sends one
+    message to every worker before waiting on any of them, so the branches
+    advance their days in parallel and only their results cross process
+    boundaries. The network's balance and P&L are the branches' added up.
+    """
+    def __init__(self, branches=4, workers=None, seed=None, **bank_options):
+        self.branches = branches
+        workers = min(branches, workers or os.cpu_count() or 1)
+        self.worker_of = [branch % workers for branch in range(branches)]
+        self.connections = []
+        self.processes = []
+        for worker in range(workers):
+            banks = {branch: Bank(seed=None if seed is None else seed + branch, **bank_options)
+                     for branch in range(branches) if self.worker_of[branch] == worker}
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_serve, args=(child, banks), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for connection, process in zip(self.connections, self.processes):
+            connection.send(None)
+            process.join()
+            connection.close()
+        self.connections = []
+        self.processes = []
+
+    def branch_of(self, name):
+        return zlib.crc32(name.encode()) % self.branches
+
+    def call_many(self, calls):
+        """Run (branch, method, args) calls, batched per worker, and return their results in order."""
+        outcomes = self._outcomes(calls)
+        for ok, result in outcomes:
+            if not ok:
+                raise result
+        return [result for _, result in outcomes]
+
+    def _outcomes(self, calls):
+        # (ok, result or exception) per call, in order, after all of them have run
+        batches = [[] for _ in self.connections]
+        for index, (branch, method, args) in enumerate(calls):
+            batches[self.worker_of[branch]].append((index, (branch, method, args)))
+        for connection, batch in zip(self.connections, batches):
+            if batch:
+                connection.send([call for _, call in batch])
+        outcomes = [None] * len(calls)
+        for connection, batch in zip(self.connections, batches):
+            if batch:
+                for (index, _), outcome in zip(batch, connection.recv()):
+                    outcomes[index] = outcome
+        return outcomes
+
+    def call(self, branch, method, *args):
+        return self.call_many([(branch, method, args)])[0]
+
+    def call_all(self, method, *args):
+        return self.call_many([(branch, method, args) for branch in range(self.branches)])
+
+    def hire_employee(self, employee):
+        self.call(self.branch_of(employee.name), "hire_employee", employee)
+
+    def fire_employee(self, employee_name):
+        self.call(self.branch_of(employee_name), "fire_employee", employee_name)
+
+    def add_customer(self, customer):
+        self.call(self.branch_of(customer.name), "add_customer", customer)
+
+    def add_customers_bulk(self, customers):
+        """Add many customers with one message per branch, returning the count."""
+        by_branch = {}
+        for customer in customers:
+            by_branch.setdefault(self.branch_of(customer.name), []).append(customer)
+        calls = [(branch, "add_customers_bulk", (chunk,)) for branch, chunk in by_branch.items()]
+        return sum(self.call_many(calls))
+
+    def get_customer(self, customer_name):
+        """A copy of the customer's record; change it through the network's methods."""
+        return self.call(self.branch_of(customer_name), "get_customer", customer_name)
+
+    def customer_deposit(self, customer_name, amount):
+        self.call(self.branch_of(customer_name), "customer_deposit", customer_name, amount)
+
+    def customer_withdraw(self, customer_name, amount):
+        self.call(self.branch_of(customer_name), "customer_withdraw", customer_name, amount)
+
+    def customer_statement(self, customer_name, first_day=None, last_day=None):
+        return self.call(self.branch_of(customer_name), "customer_statement", customer_name, first_day, last_day)
+
+    def transfer(self, from_name, to_name, amount):
+        """Move amount from one customer to another, wherever they bank; returns whether it did.
+
+        Within a branch this is one local transfer. Across branches both
+        sides are checked first (the sender can cover it, the receiver
+        exists) and only then are both legs applied together. The network
+        handles one call at a time, so nothing can change the accounts in
+        between; should a leg still fail, the other one is reversed, so a
+        transfer lands on both branches or on neither.
+        """
+        source, target = self.branch_of(from_name), self.branch_of(to_name)
+        if source == target:
+            return self.call(source, "customer_transfer", from_name, to_name, amount)
+        covered, exists = self.call_many([(source, "can_withdraw", (from_name, amount)),
+                                          (target, "get_customer", (to_name,))])
+        if not covered or exists is None:
+            return False
+        outcomes = self._outcomes([(source, "transfer_out", (from_name, amount)),
+                                   (target, "transfer_in", (to_name, amount))])
+        (sent_ok, sent), (received_ok, received) = outcomes
+        if sent_ok and sent and received_ok and received:
+            return True
+        reversals = []
+        if sent_ok and sent:
+            reversals.append((source, "transfer_in", (from_name, amount)))
+        if received_ok and received:
+            reversals.append((target, "transfer_out", (to_name, amount)))
+        self.call_many(reversals)
+        for ok, result in outcomes:
+            if not ok:
+                raise result
+        return False
+
+    def advance_day(self):
+        self.advance_days(1)
+
+    def advance_days(self, days):
+        """Advance every branch in parallel and return the consolidated balance after each day."""
+        return list(map(sum, zip(*self.call_all("advance_days", days))))
+
+    @property
+    def balance(self):
+        return sum(self.call_all("balance"))
+
+    def branch_balances(self):
+        return self.call_all("balance")
+
+    def daily_pnl(self, days=None):
+        """Consolidated daily P&L history, summing the branches' rows day by day."""
+        merged = []
+        for rows in zip(*self.call_all("reports.history", days)):
+            row = dict(rows[0])
+            for other in rows[1:]:
+                for key in ("income", "expenses", "repayments", "balance"):
+                    row[key] += other[key]
+            merged.append(row)
+        return merged
+
+    def generate_weekly_report(self):
+        return reports.merge_reports(self.call_all("generate_weekly_report"), self.call_all("reports.balances"))
+
+    def save_data(self, directory):
+        """Save every branch, in parallel, to branch-NNN.jsonl files in directory."""
+        os.makedirs(directory, exist_ok=True)
+        self.call_many([(branch, "save_data", (self.branch_path(directory, branch),))
+                        for branch in range(self.branches)])
+
+    def load_data(self, directory):
+        self.call_many([(branch, "load_data", (self.branch_path(directory, branch),))
+                        for branch in range(self.branches)])
+
+    def branch_path(self, directory, branch):
+        return os.path.join(directory, f"branch-{branch:03d}.jsonl")
@@ -0,0 +1,146 @@
+import math
+from array import array
+from money import DAYS_PER_MONTH
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, fall back to plain Python loops
+    np = None
+
+DAYS_PER_YEAR = DAYS_PER_MONTH * 12
+CARD_MINIMUM_PAYMENT = 0.03 / DAYS_PER_MONTH  # 3% of the balance a month
+
+def daily_rate(interest_rate):
+    return interest_rate / 100 / DAYS_PER_YEAR
+
+def loan_payment(amount, interest_rate, term):
+    """Fixed daily installment, in fractional cents, that pays off amount over term months."""
+    rate = daily_rate(interest_rate)
+    days = term * DAYS_PER_MONTH
+    if rate == 0:
+        return amount / days
+    return amount * rate / (1 - (1 + rate) ** -days)
+
+class CreditPortfolio:
+    """Bank-wide loan and credit card book, advanced one simulated day at a time.
+
+    Every loan is a fixed installment schedule, so the book only keeps the
+    total of installments currently due and, per future day, the total that
+    stops being due then. Card balances grow by interest and shrink by the
+    minimum payment at the same rate for every card with the same interest
+    rate, so they are tracked as one running total per rate. A day therefore
+    costs O(number of distinct card rates).
+
+    Amounts are cents. Installments and interest accrue in fractional cents,
+    which build up in unsettled and are paid out as whole cents.
+    """
+    def __init__(self):
+        self.day = 0
+        self.unsettled = 0.0  # Repayments received but not yet a whole cent
+        self.active_payments = 0.0
+        self.payments_ending = {}  # day -> installments that end that day
+        self.card_balances = {}  # daily rate -> total card balance
+        self.principals = array('d')
+        self.rates = array('d')
+        self.payments = array('d')
+        self.start_days = array('q')
+        self.term_days = array('q')
+
+    def add_loan(self, loan):
+        loan.setdefault("start_day", self.day)
+        payment = loan_payment(loan["amount"], loan["interest_rate"], loan["term"])
+        term_days = loan["term"] * DAYS_PER_MONTH
+        self.principals.append(loan["amount"])
+        self.rates.append(daily_rate(loan["interest_rate"]))
+        self.payments.append(payment)
+        self.start_days.append(loan["start_day"])
+        self.term_days.append(term_days)
+        end_day = loan["start_day"] + term_days
+        if end_day > self.day:
+            self.active_payments += payment
+            self.payments_ending[end_day] = self.payments_ending.get(end_day, 0.0) + payment
+
+    def add_credit_card(self, card):
+        card.setdefault("balance", 0.0)
+        card.setdefault("day", self.day)
+        rate = daily_rate(card["interest_rate"])
+        self.card_balances[rate] = self.card_balances.get(rate, 0.0) + self.card_balance(card)
+
+    def card_balance(self, card):
+        rate = daily_rate(card["interest_rate"])
+        growth = (1 + rate) * (1 - CARD_MINIMUM_PAYMENT)
+        return card["balance"] * growth ** (self.day - card["day"])
+
+    def charge(self, card, amount):
+        """Draw amount on card if it fits under the limit, return whether it did."""
+        balance = self.card_balance(card)
+        if balance + amount > card["limit"]:
+            return False
+        card["balance"] = balance + amount
+        card["day"] = self.day
+        rate = daily_rate(card["interest_rate"])
+        self.card_balances[rate] = self.card_balances.get(rate, 0.0) + amount
+        return True
+
+    def collect(self, days=1):
+        """Advance the book by days and return the whole cents repaid on each."""
+        repayments = []
+        for _ in range(days):
+            received = self.active_payments
+            for rate, balance in self.card_balances.items():
+                balance *= 1 + rate
+                received += balance * CARD_MINIMUM_PAYMENT
+                self.card_balances[rate] = balance * (1 - CARD_MINIMUM_PAYMENT)
+            self.unsettled += received
+            settled = math.floor(self.unsettled + 1e-9)  # Tolerate float error just under a whole cent
+            self.unsettled -= settled
+            repayments.append(settled)
+            self.day += 1
+            ended = self.payments_ending.pop(self.day, None)
+            if ended is not None:
+                self.active_payments -= ended
+                if not self.payments_ending:
+                    self.active_payments = 0.0  # Drop rounding residue once every loan is repaid
+        return repayments
+
+    def checkpoint(self):
+        """The book's state for rewind; loans are only ever appended, so only their count is kept."""
+        return (self.day, self.unsettled, self.active_payments, dict(self.payments_ending),
+                dict(self.card_balances), len(self.principals))
+
+    def rewind(self, state):
+        self.day, self.unsettled, self.active_payments, payments_ending, card_balances, loans = state
+        self.payments_ending = dict(payments_ending)
+        self.card_balances = dict(card_balances)
+        for column in (self.principals, self.rates, self.payments, self.start_days, self.term_days):
+            del column[loans:]
+
+    def outstanding_loans(self):
+        """Principal still owed across every loan, from the amortization formula."""
+        if not self.principals:
+            return 0.0
+        if np is not None:
+            principals = np.frombuffer(self.principals, dtype=np.float64)
+            rates = np.frombuffer(self.rates, dtype=np.float64)
+            payments = np.frombuffer(self.payments, dtype=np.float64)
+            paid = np.clip(self.day - np.frombuffer(self.start_days, dtype=np.int64), 0,
+                           np.frombuffer(self.term_days, dtype=np.int64))
+            growth = (1 + rates) ** paid
+            safe_rates = np.where(rates == 0, 1.0, rates)
+            owed = np.where(rates == 0, principals - payments * paid,
+                            principals * growth - payments * (growth - 1) / safe_rates)
+            return float(np.maximum(owed, 0.0).sum())
+        total = 0.0
+        for principal, rate, payment, start, term in zip(self.principals, self.rates, self.payments,
+                                                          self.start_days, self.term_days):
+            paid = min(max(self.day - start, 0), term)
+            if rate == 0:
+                owed = principal - payment * paid
+            else:
+                growth = (1 + rate) ** paid
+                owed = principal * growth - payment * (growth - 1) / rate
+            total += max(owed, 0.0)
+        return total
+
+    def outstanding_cards(self):
+        return sum(self.card_balances.values())
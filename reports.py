@@ -0,0 +1,275 @@
+import math
+from collections import deque
+from money import CENTS, format_money
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+HISTORY_WEEKS = 52  # Daily P&L rows kept; weekly rollups are kept for good
+SKETCH_ACCURACY = 0.01  # Relative error of balance quantiles
+QUANTILES = (0.1, 0.5, 0.9, 0.99)
+
+class BalanceSketch:
+    """Streaming histogram of customer balances, in cents, with relative-error quantiles.
+
+    Balances are counted in logarithmic buckets that are SKETCH_ACCURACY
+    wide, so adding, removing or moving a balance is O(1) and the sketch's
+    size depends on the range of balances, not on how many customers there
+    are. Quantiles and the histogram are read off the buckets and are
+    within SKETCH_ACCURACY of the exact answer.
+    """
+    def __init__(self, accuracy=SKETCH_ACCURACY):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}  # bucket -> count
+        self.negative = {}  # bucket of the magnitude -> count
+        self.zero = 0
+        self.count = 0
+        self.total = 0
+
+    def add(self, value, count=1):
+        self.count += count
+        self.total += value * count
+        if not value:
+            self.zero += count
+            return
+        counts = self.positive if value > 0 else self.negative
+        bucket = math.ceil(math.log(abs(value)) / self.log_gamma)
+        counts[bucket] = counts.get(bucket, 0) + count
+        if not counts[bucket]:
+            del counts[bucket]
+
+    def remove(self, value):
+        self.add(value, -1)
+
+    def move(self, old_value, new_value):
+        if old_value != new_value:
+            self.remove(old_value)
+            self.add(new_value)
+
+    def merge(self, other):
+        """Fold another sketch with the same accuracy into this one."""
+        for counts, other_counts in ((self.positive, other.positive), (self.negative, other.negative)):
+            for bucket, count in other_counts.items():
+                counts[bucket] = counts.get(bucket, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+
+    def to_dict(self):
+        return {"positive": list(self.positive.items()), "negative": list(self.negative.items()),
+                "zero": self.zero, "count": self.count, "total": self.total}
+
+    def load(self, data):
+        self.positive = dict(data["positive"])
+        self.negative = dict(data["negative"])
+        self.zero = data["zero"]
+        self.count = data["count"]
+        self.total = data["total"]
+
+    def _value(self, bucket):
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+
+    def buckets(self):
+        """Yield (representative balance, count) in ascending order of balance."""
+        for bucket in sorted(self.negative, reverse=True):
+            yield -self._value(bucket), self.negative[bucket]
+        if self.zero:
+            yield 0, self.zero
+        for bucket in sorted(self.positive):
+            yield self._value(bucket), self.positive[bucket]
+
+    def quantiles(self, qs=QUANTILES):
+        """Approximate balances at each of the ascending quantiles qs, in one pass."""
+        results = []
+        targets = iter(qs)
+        q = next(targets, None)
+        seen = 0
+        for value, count in self.buckets():
+            seen += count
+            while q is not None and seen > q * (self.count - 1):
+                results.append(value)
+                q = next(targets, None)
+        return results + [None] * (len(qs) - len(results))
+
+    def histogram(self):
+        """Customer counts per power of ten of balance in dollars."""
+        rows = {}
+        for value, count in self.buckets():
+            if value < 0:
+                label = "negative"
+            elif value == 0:
+                label = "zero"
+            else:
+                label = f"< {10 ** max(math.floor(math.log10(value / CENTS)) + 1, 0):,}"
+            rows[label] = rows.get(label, 0) + count
+        return rows
+
+def new_week(number, first_day):
+    return {
+        "week": number,
+        "first_day": first_day,
+        "last_day": first_day,
+        "days": 0,
+        "income": 0,
+        "expenses": 0,
+        "repayments": 0,
+        "net": 0,
+        "closing_balance": None,
+        "income_by_weekday": [0] * len(WEEKDAYS),
+        "expenses_by_weekday": [0] * len(WEEKDAYS)
+    }
+
+class Reports:
+    """Rolling P&L history and weekly rollups in cents, updated as each day is simulated.
+
+    Every simulated day adds one row to a bounded daily history and folds
+    into the rollup of its week, which is closed off after Saturday. A
+    weekly report then only reads the latest rollup, the scheduler's
+    headcounts, the bank's running payroll totals and the balance sketch.
+    """
+    def __init__(self):
+        self.days = deque(maxlen=HISTORY_WEEKS * len(WEEKDAYS))  # (day, weekday, income, expenses, repayments, balance)
+        self.weeks = []
+        self.week = None
+        self.balances = BalanceSketch()
+
+    def record_days(self, day, weekday, incomes, expenses, repayments, balances):
+        """Record consecutive days starting at day, expenses being indexed by weekday."""
+        for income, repayment, balance in zip(incomes, repayments, balances):
+            if self.week is None:
+                self.week = new_week(len(self.weeks) + 1, day)
+            week = self.week
+            week["last_day"] = day
+            week["days"] += 1
+            week["income"] += income
+            week["expenses"] += expenses[weekday]
+            week["repayments"] += repayment
+            week["net"] += income - expenses[weekday] + repayment
+            week["closing_balance"] = balance
+            week["income_by_weekday"][weekday] += income
+            week["expenses_by_weekday"][weekday] += expenses[weekday]
+            self.days.append((day, weekday, income, expenses[weekday], repayment, balance))
+            day += 1
+            weekday += 1
+            if weekday == len(WEEKDAYS):
+                self.weeks.append(week)
+                self.week = None
+                weekday = 0
+                day += 1  # Closed on Sunday
+
+    def history(self, days=None):
+        """The last days rows of the daily P&L as dicts, oldest first."""
+        rows = list(self.days)[-days:] if days else self.days
+        fields = ("day", "weekday", "income", "expenses", "repayments", "balance")
+        return [dict(zip(fields, row)) for row in rows]
+
+    def latest_week(self):
+        """The last complete week, or the week in progress before the first one closes."""
+        if self.weeks:
+            return self.weeks[-1]
+        return self.week or new_week(1, None)
+
+    def weekly_report(self, scheduler, position_payroll):
+        week = self.latest_week()
+        workdays = len(WEEKDAYS) - 1
+        return {
+            "week": dict(week, income_by_weekday=list(week["income_by_weekday"]),
+                         expenses_by_weekday=list(week["expenses_by_weekday"])),
+            "headcount_by_day": list(scheduler.headcount),
+            "headcount_by_position": {position: sum(counts) // workdays
+                                      for position, counts in scheduler.position_headcount.items() if any(counts)},
+            "payroll_by_position": {position: payroll for position, payroll in position_payroll.items() if payroll},
+            **balance_summary(self.balances)
+        }
+
+    def checkpoint(self):
+        """The history for rewind; closed weeks never change, so they are shared rather than copied."""
+        return tuple(self.days), list(self.weeks), _copy_week(self.week)
+
+    def rewind(self, state):
+        days, weeks, week = state
+        self.days.clear()
+        self.days.extend(days)
+        self.weeks = list(weeks)
+        self.week = _copy_week(week)
+
+    def to_dict(self):
+        return {"days": [list(row) for row in self.days], "weeks": self.weeks, "week": self.week}
+
+    def load(self, data):
+        """Restore the P&L history saved by to_dict; balances are re-counted from the customers."""
+        self.days.clear()
+        self.days.extend(tuple(row) for row in data.get("days", []))
+        self.weeks = data.get("weeks", [])
+        self.week = data.get("week")
+
+def _copy_week(week):
+    if week is None:
+        return None
+    return dict(week, income_by_weekday=list(week["income_by_weekday"]),
+                expenses_by_weekday=list(week["expenses_by_weekday"]))
+
+def balance_summary(sketch):
+    return {
+        "customers": sketch.count,
+        "total_balance": sketch.total,
+        "balance_quantiles": dict(zip((f"p{round(q * 100)}" for q in QUANTILES), sketch.quantiles())),
+        "balance_histogram": sketch.histogram()
+    }
+
+def merge_reports(reports, sketches):
+    """Consolidate weekly reports of banks that advance in step, such as branches.
+
+    Money and headcounts add up; quantiles cannot, so they are read from the
+    banks' balance sketches merged together.
+    """
+    sketch = BalanceSketch()
+    for other in sketches:
+        sketch.merge(other)
+    week = None
+    headcount_by_day = [0] * len(WEEKDAYS)
+    headcount_by_position = {}
+    payroll_by_position = {}
+    for report in reports:
+        branch_week = report["week"]
+        if week is None:
+            week = dict(branch_week, closing_balance=branch_week["closing_balance"] or 0,
+                        income_by_weekday=list(branch_week["income_by_weekday"]),
+                        expenses_by_weekday=list(branch_week["expenses_by_weekday"]))
+        else:
+            for key in ("income", "expenses", "repayments", "net"):
+                week[key] += branch_week[key]
+            week["closing_balance"] += branch_week["closing_balance"] or 0
+            for key in ("income_by_weekday", "expenses_by_weekday"):
+                week[key] = [a + b for a, b in zip(week[key], branch_week[key])]
+        headcount_by_day = [a + b for a, b in zip(headcount_by_day, report["headcount_by_day"])]
+        for merged, counts in ((headcount_by_position, report["headcount_by_position"]),
+                               (payroll_by_position, report["payroll_by_position"])):
+            for key, value in counts.items():
+                merged[key] = merged.get(key, 0) + value
+    return {
+        "week": week or new_week(1, None),
+        "headcount_by_day": headcount_by_day,
+        "headcount_by_position": headcount_by_position,
+        "payroll_by_position": payroll_by_position,
+        **balance_summary(sketch)
+    }
+
+def format_report(report):
+    week = report["week"]
+    lines = [f"Week {week['week']} (days {week['first_day']}-{week['last_day']}, {week['days']} recorded)",
+             f"  Income {format_money(week['income'])}  Expenses {format_money(week['expenses'])}  "
+             f"Repayments {format_money(week['repayments'])}  Net {format_money(week['net'])}",
+             "", f"  {'Day':<10} {'Income':>14} {'Expenses':>14} {'Staff':>6}"]
+    for day, name in enumerate(WEEKDAYS):
+        lines.append(f"  {name:<10} {format_money(week['income_by_weekday'][day]):>14} "
+                     f"{format_money(week['expenses_by_weekday'][day]):>14} {report['headcount_by_day'][day]:>6}")
+    lines += ["", f"  {'Position':<16} {'Staff':>6} {'Weekly payroll':>16}"]
+    for position, headcount in sorted(report["headcount_by_position"].items()):
+        payroll = format_money(report['payroll_by_position'].get(position, 0))
+        lines.append(f"  {position:<16} {headcount:>6} {payroll:>16}")
+    lines += ["", f"  {report['customers']} customers holding {format_money(report['total_balance'])}"]
+    lines.append("  Balance quantiles: " + ", ".join(
+        f"{name} {format_money(value)}" for name, value in report["balance_quantiles"].items() if value is not None))
+    for label, count in report["balance_histogram"].items():
+        lines.append(f"  {label:>16} {count:>10}")
+    return "\n".join(lines)
@@ -0,0 +1,107 @@
+import pickle
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from bank import Bank
+from employee import Employee
+from customer import Customer
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, fall back to sorting per customer
+    np = None
+
+PERCENTILES = (5, 50, 95)
+
+# Set once per worker process by _init_worker
+_bank_state = None
+_actions = None
+
+def apply_action(bank, action, rng):
+    """Apply one scripted action, either an (op, *args) tuple or a callable(bank, rng)."""
+    if callable(action):
+        action(bank, rng)
+        return
+    op, *args = action
+    if op == "hire":
+        bank.hire_employee(Employee(*args))
+    elif op == "fire":
+        bank.fire_employee(*args)
+    elif op == "add_customer":
+        bank.add_customer(Customer(*args))
+    elif op == "deposit":
+        bank.customer_deposit(*args)
+    elif op == "withdraw":
+        bank.customer_withdraw(*args)
+    elif op == "advance":
+        bank.advance_days(*args)
+    else:
+        raise ValueError(f"Unknown scenario action: {op}")
+
+def _init_worker(bank_state, actions):
+    global _bank_state, _actions
+    _bank_state = bank_state
+    _actions = actions
+
+def _run_one(seed):
+    # Unpickling the shared bytes is the cheapest way to get a private copy
+    bank = pickle.loads(_bank_state)
+    bank.scheduler.random.seed(seed)
+    rng = random.Random(seed)
+    for action in _actions:
+        apply_action(bank, action, rng)
+    return (bank.balance, array('q', bank.customers).tobytes(),
+            array('q', (c.balance for c in bank.customers.values())).tobytes())
+
+def percentile(sorted_values, q):
+    position = (len(sorted_values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+def summarize(values):
+    values = sorted(values)
+    stats = {"mean": sum(values) / len(values), "min": values[0], "max": values[-1]}
+    for q in PERCENTILES:
+        stats[f"p{q}"] = percentile(values, q)
+    return stats
+
+def run_scenarios(bank, actions, runs=100, seed=0, workers=None):
+    """Run actions against runs independently seeded copies of bank in parallel.
+
+    The bank is pickled once and handed to each worker process when it
+    starts, so every run only pays for unpickling a local copy. Returns the
+    distribution of the final vault balance and, per customer of the final
+    banks, the distribution of their final balance; every run must end
+    with the same customers.
+    """
+    state = pickle.dumps(bank, protocol=pickle.HIGHEST_PROTOCOL)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state, actions)) as pool:
+        results = list(pool.map(_run_one, range(seed, seed + runs)))
+
+    balances = [balance for balance, _, _ in results]
+    ids = results[0][1]
+    if any(run_ids != ids for _, run_ids, _ in results):
+        raise ValueError("runs ended with different customers, so their balances cannot be compared")
+    customer_runs = [array('q', data) for _, _, data in results]
+    customer_stats = {"ids": array('q', ids).tolist()}
+    if np is not None and customer_runs[0]:
+        matrix = np.array(customer_runs)
+        customer_stats["mean"] = matrix.mean(axis=0).tolist()
+        for q in PERCENTILES:
+            customer_stats[f"p{q}"] = np.percentile(matrix, q, axis=0).tolist()
+    else:
+        per_customer = [sorted(column) for column in zip(*customer_runs)]
+        customer_stats["mean"] = [sum(column) / runs for column in per_customer]
+        for q in PERCENTILES:
+            customer_stats[f"p{q}"] = [percentile(column, q) for column in per_customer]
+    return {"runs": runs, "balance": summarize(balances), "customer_balance": customer_stats}
+
+if __name__ == "__main__":
+    bank = Bank()
+    bank.load_data("bank_data.json")
+    # What does hiring 3 tellers do to the vault over 6 months?
+    actions = [("hire", f"New Teller {i}", 25, "Teller", 1500) for i in range(3)]
+    actions.append(("advance", 6 * 26))
+    result = run_scenarios(bank, actions, runs=20)
+    print("Vault balance after 6 months (cents):", result["balance"])
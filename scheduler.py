@@ -0,0 +1,60 @@
+import random
+
+DAYS = range(6)  # Monday to Saturday
+FULL_WEEK = (1 << len(DAYS)) - 1
+
+class Scheduler:
+    """Weekly rota where every employee works five of the six open days.
+
+    Employees are placed one at a time: each gets the day off on which their
+    position, and then the staff as a whole, is most crowded. Headcount stays
+    balanced without reshuffling anyone else, and ties are broken with a
+    seeded generator so runs can be reproduced.
+    """
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+        self.clear()
+
+    def clear(self):
+        self.days = {day: {} for day in DAYS}  # day -> {employee id: name}
+        self.days_off = {}  # employee id -> day off
+        self.headcount = [0] * len(DAYS)
+        self.position_headcount = {}  # position -> headcount per day
+
+    def choose_day_off(self, position):
+        counts = self.position_headcount.get(position, [0] * len(DAYS))
+        crowding = [(counts[day], self.headcount[day]) for day in DAYS]
+        busiest = max(crowding)
+        return self.random.choice([day for day in DAYS if crowding[day] == busiest])
+
+    def place(self, employee, day_off=None):
+        if day_off is None:
+            day_off = self.choose_day_off(employee.position)
+        self.days_off[employee.id] = day_off
+        counts = self.position_headcount.setdefault(employee.position, [0] * len(DAYS))
+        for day in DAYS:
+            if day != day_off:
+                self.days[day][employee.id] = employee.name
+                self.headcount[day] += 1
+                counts[day] += 1
+        return day_off
+
+    def remove(self, employee):
+        day_off = self.days_off.pop(employee.id, None)
+        if day_off is None:
+            return
+        counts = self.position_headcount[employee.position]
+        for day in DAYS:
+            if day != day_off:
+                del self.days[day][employee.id]
+                self.headcount[day] -= 1
+                counts[day] -= 1
+
+    def mask(self, employee_id):
+        return FULL_WEEK & ~(1 << self.days_off[employee_id])
+
+    def working_on(self, day):
+        return self.days.get(day, {})
+
+    def names_by_day(self):
+        return {day: list(working.values()) for day, working in self.days.items()}
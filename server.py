@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import json
+import os
+from bank import Bank
+import batch
+
+# Teller operations and reports; saving, loading, journals, imports and checkpoints stay with the operator
+SERVED_COMMANDS = {"deposit", "withdraw", "add_customer", "hire", "fire", "advance"} | batch.REPORTS
+
+class TellerServer:
+    """Line-based TCP front end that lets many clients share one Bank.
+
+    Clients send the same CSV or JSON lines as batch.py and get one JSON
+    response line per request, in order. Requests that arrive together are
+    handled as a batch: the accounts they touch are locked, the commands
+    run, and when a journal is attached the whole batch waits on a single
+    fsync shared with every other connection before it is acknowledged.
+    Only accounts are locked, so clients working on different customers
+    never wait for each other.
+    """
+    def __init__(self, bank):
+        self.bank = bank
+        self.account_locks = {}
+        self.lock_users = {}  # name -> batches holding or waiting for the account's lock
+        self.pending_sync = None
+
+    def account_lock(self, name):
+        lock = self.account_locks.get(name)
+        if lock is None:
+            lock = self.account_locks[name] = asyncio.Lock()
+        self.lock_users[name] = self.lock_users.get(name, 0) + 1
+        return lock
+
+    def drop_account_lock(self, name):
+        # Forget the lock once no batch holds or waits for it, so idle accounts cost nothing
+        self.lock_users[name] -= 1
+        if not self.lock_users[name]:
+            del self.lock_users[name]
+            del self.account_locks[name]
+
+    def sync(self):
+        """Return a future for the next group commit of the journal."""
+        if self.pending_sync is None:
+            self.pending_sync = asyncio.get_running_loop().create_future()
+            # Let every request handled in this pass of the loop join the same fsync
+            asyncio.get_running_loop().call_soon(lambda: asyncio.ensure_future(self._commit()))
+        return self.pending_sync
+
+    async def _commit(self):
+        future, self.pending_sync = self.pending_sync, None
+        try:
+            if self.bank.journal is not None:
+                fd = os.dup(self.bank.journal.flush())
+                try:
+                    await asyncio.get_running_loop().run_in_executor(None, os.fsync, fd)
+                finally:
+                    os.close(fd)
+            future.set_result(None)
+        except OSError as e:
+            future.set_exception(e)
+
+    async def handle_batch(self, lines):
+        commands = []
+        for line in lines:
+            try:
+                command = batch.parse_line(line)
+                if command is not None and command[0] not in SERVED_COMMANDS:
+                    raise ValueError(f"Command not served: {command[0]}")
+                commands.append(command)
+            except (ValueError, KeyError, IndexError) as e:
+                commands.append(e)
+        accounts = sorted({name for command in commands if isinstance(command, tuple)
+                           for name in batch.accounts(*command)})
+        # Take locks in a fixed order so two batches can never deadlock
+        locks = [self.account_lock(name) for name in accounts]
+        held = []
+        try:
+            for lock in locks:
+                await lock.acquire()
+                held.append(lock)
+            responses = []
+            changed = False
+            for command in commands:
+                if command is None:
+                    continue
+                if isinstance(command, Exception):
+                    responses.append({"ok": False, "error": str(command)})
+                    continue
+                try:
+                    result = batch.execute(self.bank, *command)
+                    responses.append({"ok": True, "result": result})
+                    changed = changed or command[0] not in batch.REPORTS
+                except Exception as e:
+                    responses.append({"ok": False, "error": f"{type(e).__name__}: {e}"})
+            if changed and self.bank.journal is not None:
+                await self.sync()
+            return responses
+        finally:
+            for lock in held:
+                lock.release()
+            for name in accounts:
+                self.drop_account_lock(name)
+
+    async def handle_client(self, reader, writer):
+        buffer = b""
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                if not lines:
+                    continue
+                responses = await self.handle_batch([line.decode() for line in lines])
+                writer.write("".join(json.dumps(r) + "\n" for r in responses).encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port, backlog=4096)
+        async with server:
+            await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve one Bank to many teller clients over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--load", help="save file to load at startup")
+    parser.add_argument("--journal", help="journal directory to recover from and log to")
+    args = parser.parse_args()
+
+    bank = Bank()
+    if args.load:
+        bank.load_data(args.load)
+    if args.journal:
+        # The server commits the journal itself, once per batch of requests
+        bank.open_journal(args.journal, commit_every=float("inf"), commit_interval=float("inf"))
+    try:
+        asyncio.run(TellerServer(bank).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bank.close_journal()
+
+if __name__ == "__main__":
+    main()
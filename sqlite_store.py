@@ -0,0 +1,266 @@
+import errno
+import json
+import os
+import sqlite3
+from atomic import atomic_path
+from customer import Customer
+import money
+
+BATCH_SIZE = 10000
+CACHE_SIZE = 100000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bank (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS employees (id INTEGER PRIMARY KEY, name TEXT NOT NULL, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    balance INTEGER NOT NULL,
+    monthly_income INTEGER NOT NULL,
+    has_credit INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ledger (segment INTEGER PRIMARY KEY, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS customers_name ON customers (name, id);
+CREATE INDEX IF NOT EXISTS customers_credit ON customers (id) WHERE has_credit;
+"""
+
+INSERT_CUSTOMER = "INSERT OR REPLACE INTO customers VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_EMPLOYEE = "INSERT OR REPLACE INTO employees VALUES (?, ?, ?)"
+INSERT_LEDGER = "INSERT OR REPLACE INTO ledger VALUES (?, ?)"
+
+def connect(file_path):
+    db = sqlite3.connect(file_path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+    return db
+
+def customer_row(data):
+    has_credit = bool(data["loans"] or data["credit_cards"])
+    return (data["id"], data["name"], data["balance"], data["monthly_income"], has_credit,
+            json.dumps(data, separators=(',', ':')))
+
+def employee_row(data):
+    return data["id"], data["name"], json.dumps(data, separators=(',', ':'))
+
+def write_records(file_path, records):
+    """Export (kind, data) records into a new SQLite database at file_path."""
+    with atomic_path(file_path) as tmp_path:
+        db = connect(tmp_path)
+        try:
+            batches = {"employee": [], "customer": []}
+            ledger_segments = 0
+            statements = {"employee": (INSERT_EMPLOYEE, employee_row), "customer": (INSERT_CUSTOMER, customer_row)}
+            for kind, data in records:
+                if kind == "bank":
+                    db.execute("INSERT OR REPLACE INTO bank VALUES ('bank', ?)", (json.dumps(data),))
+                    continue
+                if kind == "ledger":
+                    db.execute(INSERT_LEDGER, (ledger_segments, json.dumps(data, separators=(',', ':'))))
+                    ledger_segments += 1
+                    continue
+                batch = batches[kind]
+                batch.append(statements[kind][1](data))
+                if len(batch) >= BATCH_SIZE:
+                    db.executemany(statements[kind][0], batch)
+                    batch.clear()
+            for kind, batch in batches.items():
+                db.executemany(statements[kind][0], batch)
+            db.commit()
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            db.close()
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(tmp_path + suffix):
+                    os.unlink(tmp_path + suffix)
+
+def read_records(file_path):
+    """Yield (kind, data) records from a SQLite database, a batch of rows at a time."""
+    if not os.path.exists(file_path):
+        # Connecting would create an empty database and read that instead
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), file_path)
+    db = connect(file_path)
+    try:
+        row = db.execute("SELECT value FROM bank WHERE key = 'bank'").fetchone()
+        yield "bank", json.loads(row[0]) if row else {"current_day": 1, "day_of_week": 0, "balance": 0,
+                                           "money": money.MONEY_UNIT}
+        for kind, query in (("employee", "SELECT data FROM employees ORDER BY id"),
+                            ("customer", "SELECT data FROM customers ORDER BY id"),
+                            ("ledger", "SELECT data FROM ledger ORDER BY segment")):
+            cursor = db.execute(query)
+            while True:
+                rows = cursor.fetchmany(BATCH_SIZE)
+                if not rows:
+                    break
+                for (data,) in rows:
+                    yield kind, json.loads(data)
+    finally:
+        db.close()
+
+class SQLiteStore:
+    """Live SQLite backing for a Bank whose customers are loaded on demand.
+
+    Employees and the bank header are small and kept in memory. Customers
+    stay in the database and are materialized (and cached) only when looked
+    up, and every change is written straight back. Changes are committed in
+    groups of commit_every. A database saved in dollars is converted to
+    cents once, when it is opened.
+    """
+    def __init__(self, file_path, commit_every=1000):
+        self.db = connect(file_path)
+        self.commit_every = commit_every
+        self.pending = 0
+        # Ledger segments before this one are sealed and already stored
+        self.ledger_saved = self.db.execute("SELECT COUNT(*) FROM ledger").fetchone()[0]
+        self.customers = CustomerTable(self.db)
+        self.customer_names = CustomerNames(self.db)
+        header = self.header()
+        if header is not None and not money.is_current(header):
+            self._migrate(header)
+        # Hires and fires are written as they happen, the other rows only change as days pass
+        self.employees_day = header["current_day"] if header else None
+
+    def _migrate(self, header):
+        db = self.db
+        last_id = 0
+        while True:
+            rows = db.execute("SELECT id, data FROM customers WHERE id > ? ORDER BY id LIMIT ?",
+                              (last_id, BATCH_SIZE)).fetchall()
+            if not rows:
+                break
+            db.executemany(INSERT_CUSTOMER, (customer_row(money.migrate_customer(json.loads(data)))
+                                             for _, data in rows))
+            last_id = rows[-1][0]
+        db.executemany(INSERT_EMPLOYEE, [employee_row(money.migrate_record("employee", data))
+                                         for data in self.employees()])
+        db.executemany(INSERT_LEDGER, [(number, json.dumps(money.migrate_record("ledger", data), separators=(',', ':')))
+                                       for number, data in enumerate(self.ledger_segments())])
+        header = dict(money.migrate_header(header), money=money.MONEY_UNIT)
+        db.execute("INSERT OR REPLACE INTO bank VALUES ('bank', ?)", (json.dumps(header),))
+        db.commit()
+
+    def header(self):
+        row = self.db.execute("SELECT value FROM bank WHERE key = 'bank'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def employees(self):
+        for (data,) in self.db.execute("SELECT data FROM employees ORDER BY id"):
+            yield json.loads(data)
+
+    def ledger_segments(self):
+        for (data,) in self.db.execute("SELECT data FROM ledger ORDER BY segment"):
+            yield json.loads(data)
+
+    def credit_customers(self):
+        """Customers with loans or cards, which the credit portfolio needs up front."""
+        for (data,) in self.db.execute("SELECT data FROM customers WHERE has_credit ORDER BY id"):
+            yield json.loads(data)
+
+    def next_customer_id(self):
+        return (self.db.execute("SELECT MAX(id) FROM customers").fetchone()[0] or 0) + 1
+
+    def total_monthly_income(self):
+        return int(self.db.execute("SELECT COALESCE(SUM(monthly_income), 0) FROM customers").fetchone()[0])
+
+    def balances(self):
+        # Databases created before cents have REAL columns, which hand back floats
+        for (balance,) in self.db.execute("SELECT balance FROM customers"):
+            yield int(balance)
+
+    def total_balance(self):
+        return int(self.db.execute("SELECT COALESCE(SUM(balance), 0) FROM customers").fetchone()[0])
+
+    def put_customer(self, customer):
+        self.customers[customer.id] = customer
+
+    def put_employee(self, employee):
+        self.db.execute(INSERT_EMPLOYEE, employee_row(employee.to_dict()))
+
+    def delete_employee(self, employee_id):
+        self.db.execute("DELETE FROM employees WHERE id = ?", (employee_id,))
+
+    def changed(self, bank):
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit(bank)
+
+    def commit(self, bank):
+        header = next(bank.iter_records())[1]
+        self.db.execute("INSERT OR REPLACE INTO bank VALUES ('bank', ?)", (json.dumps(header),))
+        if bank.current_day != self.employees_day:
+            self.db.executemany(INSERT_EMPLOYEE, (employee_row(e.to_dict()) for e in bank.employees.values()))
+            self.employees_day = bank.current_day
+        ledger = bank.ledger
+        for number in range(self.ledger_saved, ledger.segment_count()):
+            data = ledger.segment_data(number)
+            if data["day"]:
+                self.db.execute(INSERT_LEDGER, (number, json.dumps(data, separators=(',', ':'))))
+        self.ledger_saved = max(ledger.segment_count() - 1, self.ledger_saved)
+        self.db.commit()
+        self.pending = 0
+
+    def close(self, bank):
+        self.commit(bank)
+        self.db.close()
+
+class CustomerTable:
+    """Dict-like view of the customers table keyed by id."""
+    def __init__(self, db):
+        self.db = db
+        self.cache = {}
+
+    def _remember(self, customer):
+        if len(self.cache) >= CACHE_SIZE:
+            self.cache.pop(next(iter(self.cache)))
+        self.cache[customer.id] = customer
+
+    def get(self, customer_id, default=None):
+        customer = self.cache.get(customer_id)
+        if customer is not None:
+            return customer
+        row = self.db.execute("SELECT data FROM customers WHERE id = ?", (customer_id,)).fetchone()
+        if row is None:
+            return default
+        customer = Customer.from_dict(json.loads(row[0]))
+        self._remember(customer)
+        return customer
+
+    def __getitem__(self, customer_id):
+        customer = self.get(customer_id)
+        if customer is None:
+            raise KeyError(customer_id)
+        return customer
+
+    def __setitem__(self, customer_id, customer):
+        self._remember(customer)
+        self.db.execute(INSERT_CUSTOMER, customer_row(customer.to_dict()))
+
+    def __contains__(self, customer_id):
+        return customer_id in self.cache or self.db.execute(
+            "SELECT 1 FROM customers WHERE id = ?", (customer_id,)).fetchone() is not None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+    def __iter__(self):
+        for (customer_id,) in self.db.execute("SELECT id FROM customers ORDER BY id"):
+            yield customer_id
+
+    def values(self):
+        # Stream without caching so a full pass does not pull the table into memory
+        for customer_id, data in self.db.execute("SELECT id, data FROM customers ORDER BY id"):
+            customer = self.cache.get(customer_id)
+            yield customer if customer is not None else Customer.from_dict(json.loads(data))
+
+class CustomerNames:
+    """Name -> [ids] lookups answered from the customers name index."""
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, name, default=None):
+        ids = [row[0] for row in self.db.execute("SELECT id FROM customers WHERE name = ? ORDER BY id", (name,))]
+        return ids or default
+
+    def __contains__(self, name):
+        return self.db.execute("SELECT 1 FROM customers WHERE name = ?", (name,)).fetchone() is not None
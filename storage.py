@@ -0,0 +1,67 @@
+import json
+from atomic import atomic_write
+import mmap_store
+import sqlite_store
+
+FORMAT = "bank-jsonl"
+VERSION = 1
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+def write_records(file_path, records):
+    """Atomically write (kind, data) records to file_path as JSON Lines.
+
+    The first record must be the ("bank", {...}) header. Records are
+    streamed to a temporary file in the same directory which replaces
+    file_path only once everything has been written and synced. Paths
+    ending in .db, .sqlite or .sqlite3 are exported to SQLite instead, and
+    paths ending in .snapshot or .snap to a memory-mappable binary snapshot.
+    """
+    if file_path.endswith(SQLITE_EXTENSIONS):
+        sqlite_store.write_records(file_path, records)
+        return
+    if mmap_store.is_snapshot(file_path):
+        mmap_store.write_records(file_path, records)
+        return
+    with atomic_write(file_path) as f:
+        for kind, data in records:
+            if kind == "bank":
+                data = dict(data, format=FORMAT, version=VERSION)
+            f.write(json.dumps({kind: data}, separators=(',', ':')))
+            f.write("\n")
+
+def read_records(file_path):
+    """Yield (kind, data) records from a JSON Lines, legacy JSON, SQLite or snapshot save file."""
+    if file_path.endswith(SQLITE_EXTENSIONS):
+        yield from sqlite_store.read_records(file_path)
+        return
+    if mmap_store.is_snapshot(file_path):
+        yield from mmap_store.read_records(file_path)
+        return
+    with open(file_path, 'r') as f:
+        first_line = f.readline()
+        try:
+            header = json.loads(first_line)
+        except ValueError:
+            header = None
+        if not (isinstance(header, dict) and header.get("bank", {}).get("format") == FORMAT):
+            f.seek(0)
+            yield from _read_legacy(f)
+            return
+        yield "bank", header["bank"]
+        for line in f:
+            if line.strip():
+                (kind, data), = json.loads(line).items()
+                yield kind, data
+
+def _read_legacy(f):
+    # The original single-document layout written by json.dump(..., indent=4)
+    data = json.load(f)
+    yield "bank", {
+        "current_day": data['current_day'],
+        "day_of_week": data['day_of_week'],
+        "balance": data['balance']
+    }
+    for e in data['employees']:
+        yield "employee", e
+    for c in data['customers']:
+        yield "customer", c
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import build_bank  # noqa: E402
+
+
+@pytest.fixture
+def make_bank():
+    """Factory for a small reproducible bank with loans, cards and some history."""
+    def make(columnar=False, customers=30, employees=8):
+        bank = build_bank(customers, employees, columnar=columnar, seed=1)
+        for i in range(0, customers, 5):
+            bank.issue_loan(f"Customer {i}", 100000 * (i + 1), 5.0, 1 + i % 3)
+            bank.open_credit_card(f"Customer {i}", 500000, 18.0)
+            bank.charge_credit_card(f"Customer {i}", 2500 * (i + 1))
+        bank.customer_deposit("Customer 1", 12345)
+        bank.customer_withdraw("Customer 2", 678)
+        return bank
+    return make
+
+
+@pytest.fixture
+def state():
+    """Everything a reload or recovery must reproduce, in comparable form."""
+    def capture(bank):
+        return {
+            "customers": sorted((c.id, c.name, c.balance, c.monthly_income, len(c.loans), len(c.credit_cards))
+                                for c in bank.customers.values()),
+            "employees": sorted((e.id, e.name, e.hourly_rate, e.days_employed) for e in bank.employees.values()),
+            "schedule": {day: sorted(names) for day, names in bank.schedule.items()},
+            "calendar": (bank.current_day, bank.day_of_week),
+            "balance": bank.balance,
+            "income": (bank.total_monthly_income, bank.income_carry),
+            "ledger": bank.ledger.day_entries(0, 10 ** 6),
+        }
+    return capture
@@ -0,0 +1,78 @@
+import os
+
+from bank import Bank
+from customer import Customer
+
+
+def recover(directory):
+    bank = Bank()
+    bank.open_journal(directory)
+    return bank
+
+
+def crash(bank):
+    # Leave the journal as a killed process would, without closing it
+    bank.journal.commit()
+    if bank.journal.snapshot_pid is not None:
+        os.waitpid(bank.journal.snapshot_pid, 0)
+    bank.journal.closing.set()
+    bank.journal = None
+
+
+def test_recovers_loaded_state_and_later_changes(tmp_path, make_bank, state):
+    bank = make_bank()
+    bank.open_journal(tmp_path / "journal")
+    bank.customer_deposit("Customer 3", 5000)
+    bank.advance_days(3)
+    bank.close_journal()
+    assert state(recover(tmp_path / "journal")) == state(bank)
+
+
+def test_recovers_after_crash(tmp_path, make_bank, state):
+    bank = make_bank()
+    bank.open_journal(tmp_path / "journal", snapshot_every=7)
+    for day in range(5):
+        bank.customer_deposit(f"Customer {day}", 100 * (day + 1))
+        bank.fire_employee(f"Employee {day}")
+        bank.advance_day()
+    bank.advance_days(9)
+    crash(bank)
+    assert state(recover(tmp_path / "journal")) == state(bank)
+
+
+def test_recovers_state_loaded_while_journaling(tmp_path, make_bank, state):
+    make_bank().save_data(str(tmp_path / "bank.jsonl"))
+    bank = Bank()
+    bank.open_journal(tmp_path / "journal")
+    bank.add_customer(Customer("X", 30, 100, 3000))
+    bank.load_data(str(tmp_path / "bank.jsonl"))
+    bank.customer_deposit("Customer 1", 700)
+    bank.close_journal()
+    recovered = recover(tmp_path / "journal")
+    assert state(recovered) == state(bank)
+    assert recovered.get_customer("X") is None
+
+
+def test_recovers_after_rewind(tmp_path, make_bank, state):
+    bank = make_bank()
+    bank.open_journal(tmp_path / "journal")
+    bank.enable_checkpoints(every=2)
+    bank.advance_days(4)
+    bank.customer_deposit("Customer 4", 900)
+    bank.advance_days(4)
+    bank.rewind(1)
+    bank.customer_withdraw("Customer 5", 300)
+    crash(bank)
+    assert state(recover(tmp_path / "journal")) == state(bank)
+
+
+def test_segments_without_snapshot_replay_onto_an_empty_bank(tmp_path, make_bank, state):
+    bank = Bank()
+    bank.open_journal(tmp_path / "journal")
+    bank.add_customer(Customer("Z", 30, 100, 3000))
+    bank.advance_day()
+    bank.close_journal()
+    os.remove(tmp_path / "journal" / "snapshot.jsonl")
+    recovered = make_bank()
+    recovered.open_journal(tmp_path / "journal")
+    assert state(recovered) == state(bank)
@@ -0,0 +1,27 @@
+import pytest
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_advance_days_matches_advancing_one_day_at_a_time(make_bank, state, columnar):
+    stepped, batched = make_bank(columnar), make_bank(columnar)
+    balances = [stepped.advance_day() or stepped.balance for _ in range(40)]
+    assert batched.advance_days(40) == balances
+    assert state(batched) == state(stepped)
+    assert batched.portfolio.outstanding_loans() == stepped.portfolio.outstanding_loans()
+    assert batched.portfolio.outstanding_cards() == stepped.portfolio.outstanding_cards()
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_rewind_restores_checkpointed_state(make_bank, state, columnar):
+    bank = make_bank(columnar)
+    bank.enable_checkpoints(every=3)
+    bank.advance_days(3)
+    saved = state(bank)
+    number = bank.checkpoint()
+    bank.customer_deposit("Customer 6", 4000)
+    bank.fire_employee("Employee 2")
+    bank.issue_loan("Customer 7", 50000, 6.0, 2)
+    bank.advance_days(10)
+    bank.rewind(number)
+    assert state(bank) == saved
+    assert [number for number, _ in bank.list_checkpoints()][-1] == number
@@ -0,0 +1,40 @@
+import pytest
+
+from bank import Bank
+
+
+@pytest.mark.parametrize("extension", ["jsonl", "db", "snap"])
+def test_save_and_load_round_trip(tmp_path, make_bank, state, extension):
+    bank = make_bank()
+    bank.advance_days(5)
+    path = str(tmp_path / f"bank.{extension}")
+    bank.save_data(path)
+    loaded = Bank()
+    loaded.load_data(path)
+    assert state(loaded) == state(bank)
+    loaded.advance_days(3)
+    bank.advance_days(3)
+    assert state(loaded) == state(bank)
+
+
+def test_open_database_round_trip(tmp_path, make_bank, state):
+    bank = make_bank()
+    path = str(tmp_path / "bank.db")
+    bank.open_database(path)
+    bank.customer_deposit("Customer 8", 2500)
+    bank.advance_days(4)
+    expected = state(bank)
+    bank.close_database()
+    reopened = Bank()
+    reopened.open_database(path)
+    assert state(reopened) == expected
+
+
+@pytest.mark.parametrize("extension", ["jsonl", "db", "snap"])
+def test_loading_a_missing_file_leaves_the_bank_alone(tmp_path, make_bank, state, extension):
+    bank = make_bank()
+    before = state(bank)
+    with pytest.raises(FileNotFoundError):
+        bank.load_data(str(tmp_path / f"missing.{extension}"))
+    assert state(bank) == before
+    assert not (tmp_path / f"missing.{extension}").exists()